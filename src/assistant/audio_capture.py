@@ -0,0 +1,252 @@
+import threading
+import weakref
+from collections import deque
+
+import numpy as np
+import sounddevice as sd
+import speech_recognition as sr
+
+from .vad import VoiceActivityDetector, SPEECH_START, SPEECH_END
+from .voice_features import StreamingSpectralStats
+
+
+class CapturedAudio(sr.AudioData):
+    """AudioData plus the spectral statistics gathered while it was recorded.
+
+    `during_playback` is set when the utterance started while the
+    assistant was speaking.
+    """
+
+    def __init__(self, frame_data, sample_rate, sample_width, features=None, during_playback=False):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self.features = features
+        self.during_playback = during_playback
+
+
+class AudioCapture:
+    """Capture microphone audio into a preallocated int16 ring buffer.
+
+    The buffer holds `slots` maximum-length utterances. Each utterance
+    starts where the previous one ended (or back at the front when a
+    maximum-length one wouldn't fit before the end), and the sounddevice
+    callback writes each block straight into it. The finished utterance
+    is handed out as a view of the buffer, so no per-block copies,
+    concatenation or WAV re-encoding happen on the way to the recognizer.
+    A view is never overwritten while anything still holds it: if the
+    next utterance would land on one, capture moves to a fresh ring and
+    the old one is freed along with its last view. The default `slots`
+    covers the utterances a VoicePipeline keeps in flight, so that is
+    rare.
+
+    Voice activity detection runs inside the callback: a short pre-roll
+    of audio is kept so word onsets aren't clipped, and `speech_ended`
+    is set as soon as the detector's hang-over runs out.
+
+    Set `is_playing` to a callable that reports whether the assistant is
+    speaking. The detector's threshold is raised while it is, and
+    utterances that still get through are marked `during_playback`, since
+    without echo cancellation they may be the assistant hearing itself.
+
+    Every block written to an utterance is also fed to a
+    StreamingSpectralStats, so the speaker features are complete the
+    moment the utterance closes.
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, max_utterance=15, slots=6,
+                 block_duration=0.03, preroll=0.3, hangover=0.3, min_speech=0.25):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = int(sample_rate * block_duration)
+        self.max_frames = int(sample_rate * max_utterance)
+        self.min_frames = int(sample_rate * min_speech)
+        self.buffer = np.zeros(self.max_frames * slots, dtype=np.int16)
+        self.start = 0
+        self.pos = 0
+        self.features = None
+        # (start, end, weak reference) of every view handed out or queued
+        self.views = []
+
+        self.vad = VoiceActivityDetector(sample_rate, block_duration, hangover=hangover)
+        self.preroll = np.zeros(int(sample_rate * preroll), dtype=np.int16)
+        self.preroll_pos = 0
+        self.preroll_filled = 0
+
+        self.stream = None
+        self.in_speech = False
+        self.on_speech_start = None
+        self.is_playing = None
+        self.started_during_playback = False
+        self.ready = deque()
+        self.ready_lock = threading.Lock()
+        self.speech_started = threading.Event()
+        self.speech_ended = threading.Event()
+
+    def begin_utterance(self):
+        """Start a new utterance, wrapping to the front if the slot won't fit."""
+        if self.pos + self.max_frames > len(self.buffer):
+            self.pos = 0
+        self.start = self.pos
+        self.features = StreamingSpectralStats(self.sample_rate)
+        self.protect_views(self.start, self.start + self.max_frames)
+
+    def protect_views(self, start, end):
+        """Move to a fresh ring if [start, end) overlaps a view that is still in use."""
+        self.views = [view for view in self.views if view[2]() is not None]
+        if any(view_start < end and view_end > start for view_start, view_end, _ in self.views):
+            # The old ring stays alive for as long as its views do
+            self.buffer = np.zeros_like(self.buffer)
+            self.views = []
+            print("Debug - Utterances still in use; moved capture to a new buffer")
+
+    def next_ready(self):
+        with self.ready_lock:
+            return self.ready.popleft() if self.ready else None
+
+    def write(self, block):
+        """Copy an int16 block into the ring. Returns False once the slot is full."""
+        # Keep only the first channel; the recognizer expects mono audio
+        samples = block[:, 0] if block.ndim > 1 else block
+        space = self.start + self.max_frames - self.pos
+        count = min(len(samples), space)
+        self.buffer[self.pos:self.pos + count] = samples[:count]
+        self.pos += count
+        if self.features is not None:
+            self.features.update(samples[:count])
+        return count == len(samples)
+
+    def frames(self):
+        """View of the samples recorded for the current utterance."""
+        return self.buffer[self.start:self.pos]
+
+    def duration(self):
+        return (self.pos - self.start) / self.sample_rate
+
+    def to_audio_data(self, start=None, end=None, features=None):
+        """Wrap an utterance as AudioData without copying it."""
+        start = self.start if start is None else start
+        end = self.pos if end is None else end
+        frame_data = memoryview(self.buffer[start:end]).cast('B')
+        audio = CapturedAudio(frame_data, self.sample_rate, 2, features, self.started_during_playback)
+        self.views.append((start, end, weakref.ref(audio)))
+        return audio
+
+    def push_preroll(self, samples):
+        """Keep the most recent audio so it can be prepended to the next utterance."""
+        size = len(self.preroll)
+        if len(samples) >= size:
+            self.preroll[:] = samples[-size:]
+            self.preroll_pos = 0
+            self.preroll_filled = size
+            return
+        end = self.preroll_pos + len(samples)
+        if end <= size:
+            self.preroll[self.preroll_pos:end] = samples
+        else:
+            split = size - self.preroll_pos
+            self.preroll[self.preroll_pos:] = samples[:split]
+            self.preroll[:end - size] = samples[split:]
+        self.preroll_pos = end % size
+        self.preroll_filled = min(size, self.preroll_filled + len(samples))
+
+    def write_preroll(self):
+        if self.preroll_filled < len(self.preroll):
+            self.write(self.preroll[:self.preroll_filled])
+        else:
+            self.write(self.preroll[self.preroll_pos:])
+            self.write(self.preroll[:self.preroll_pos])
+        self.preroll_pos = 0
+        self.preroll_filled = 0
+
+    def callback(self, indata, frames, time, status):
+        if status:
+            print(f"Debug - Audio status: {status}")
+
+        samples = indata[:, 0]
+        playing = bool(self.is_playing and self.is_playing())
+        self.vad.playback = playing
+        event = self.vad.process(samples)
+
+        if not self.in_speech:
+            if event != SPEECH_START:
+                self.push_preroll(samples)
+                return
+            self.begin_utterance()
+            self.write_preroll()
+            self.in_speech = True
+            self.started_during_playback = playing
+            self.speech_started.set()
+            if self.on_speech_start:
+                self.on_speech_start()
+
+        if not self.write(samples) or event == SPEECH_END:
+            self.finish_utterance()
+
+    def finish_utterance(self):
+        self.in_speech = False
+        self.vad.reset()
+        self.speech_started.clear()
+        if self.pos - self.start >= self.min_frames:
+            audio = self.to_audio_data(features=self.features)
+            with self.ready_lock:
+                self.ready.append(audio)
+            self.speech_ended.set()
+        self.features = None
+
+    def open(self):
+        """Start the input stream; it keeps capturing until close()."""
+        if self.stream is not None:
+            return
+        self.stream = sd.InputStream(
+            callback=self.callback,
+            channels=self.channels,
+            samplerate=self.sample_rate,
+            blocksize=self.blocksize,
+            dtype=np.int16,  # Record straight into the ring buffer format
+            latency='low'
+        )
+        self.stream.start()
+
+    def is_active(self):
+        """False once the stream is closed or has stopped on its own (e.g. unplugged mic)."""
+        return self.stream is not None and self.stream.active
+
+    def close(self):
+        if self.stream is None:
+            return
+        try:
+            self.stream.stop()
+            self.stream.close()
+        finally:
+            self.stream = None
+            self.in_speech = False
+            self.vad.reset()
+            # Wake up any listen() still waiting on the closed stream
+            self.speech_ended.set()
+
+    def listen(self, timeout=5):
+        """Wait for the next utterance and return it as AudioData.
+
+        Returns None if nobody starts speaking within `timeout` seconds.
+        If the stream isn't open yet it is opened for this call only.
+        """
+        opened_here = self.stream is None
+        if opened_here:
+            with self.ready_lock:
+                self.ready.clear()
+            self.open()
+        try:
+            while True:
+                audio = self.next_ready()
+                if audio is not None:
+                    return audio
+                if not self.speech_ended.wait(timeout):
+                    # Keep waiting while an utterance is still in progress
+                    if not self.in_speech:
+                        return None
+                    continue
+                self.speech_ended.clear()
+                if self.stream is None and not self.ready:
+                    return None
+        finally:
+            if opened_here:
+                self.close()
@@ -0,0 +1,97 @@
+from collections import deque
+
+CHARS_PER_TOKEN = 4  # Rough average for English text
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class ChatHistory:
+    """Chat context kept within a token budget.
+
+    The most recent turns are sent verbatim. Once they take up more than
+    `budget` tokens (together with the summary and pinned facts), the
+    oldest ones are handed out by overflow() to be folded into a rolling
+    summary, down to `low_water` of the budget so that summarizing
+    happens now and then rather than on every turn. Pinned facts are
+    always sent and never summarized away. At least `keep_turns` turns
+    are always kept verbatim.
+    """
+
+    def __init__(self, budget=4000, keep_turns=6, low_water=0.6, summary_tokens=300):
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.low_water = low_water
+        self.summary_tokens = summary_tokens
+        self.turns = deque()
+        self.turn_tokens = 0
+        self.summary = ""
+        self.pinned = []
+
+    def add(self, role, text):
+        tokens = estimate_tokens(text)
+        self.turns.append((role, text, tokens))
+        self.turn_tokens += tokens
+
+    def pin(self, fact):
+        if fact not in self.pinned:
+            self.pinned.append(fact)
+
+    def unpin(self, fact):
+        if fact in self.pinned:
+            self.pinned.remove(fact)
+
+    def fixed_tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(fact) for fact in self.pinned)
+
+    def tokens(self):
+        return self.fixed_tokens() + self.turn_tokens
+
+    def over_budget(self):
+        return self.tokens() > self.budget and len(self.turns) > self.keep_turns
+
+    def overflow(self):
+        """The oldest turns to summarize so the rest fits under the low-water mark.
+
+        They stay in the history until compact() replaces them.
+        """
+        target = self.budget * self.low_water - self.fixed_tokens()
+        tokens = self.turn_tokens
+        turns = []
+        for role, text, turn_tokens in self.turns:
+            if tokens <= target or len(self.turns) - len(turns) <= self.keep_turns:
+                break
+            turns.append((role, text))
+            tokens -= turn_tokens
+        return turns
+
+    def compact(self, count, summary):
+        """Replace the `count` oldest turns with an updated summary."""
+        for _ in range(min(count, len(self.turns))):
+            self.turn_tokens -= self.turns.popleft()[2]
+        self.summary = summary
+
+    def fallback_summary(self, turns):
+        """A crude summary for when the model can't write one: what the user asked, cut to fit."""
+        asked = [f"User asked: {text}" for role, text in turns if role == 'user']
+        summary = "\n".join(filter(None, [self.summary] + asked))
+        limit = self.summary_tokens * CHARS_PER_TOKEN
+        return summary[-limit:]
+
+    def contents(self, message=None):
+        """History in generate_content format, optionally followed by a new user message."""
+        contents = []
+        context = []
+        if self.pinned:
+            context.append("Facts to remember:\n" + "\n".join(f"- {fact}" for fact in self.pinned))
+        if self.summary:
+            context.append("Summary of the conversation so far:\n" + self.summary)
+        if context:
+            contents.append({'role': 'user', 'parts': ["\n\n".join(context)]})
+            contents.append({'role': 'model', 'parts': ["Understood."]})
+        for role, text, _ in self.turns:
+            contents.append({'role': role, 'parts': [text]})
+        if message is not None:
+            contents.append({'role': 'user', 'parts': [message]})
+        return contents
@@ -0,0 +1,140 @@
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+
+
+class CommandCancelled(Exception):
+    pass
+
+
+class CommandTimeout(Exception):
+    pass
+
+
+class CommandExecutor:
+    """Run shell commands on a background asyncio loop.
+
+    Up to `max_concurrent` commands run at once. Output is passed to an
+    optional `on_line` callback line by line as it arrives. A command that
+    runs past its timeout, or is cancelled, is killed together with every
+    child process it started.
+    """
+
+    def __init__(self, max_concurrent=4, timeout=10):
+        self.timeout = timeout
+        self.counter = itertools.count(1)
+        self.jobs = {}
+        self.loop = asyncio.new_event_loop()
+        self.max_concurrent = max_concurrent
+        self.semaphore = None
+        self.thread = threading.Thread(target=self.loop.run_forever, name="command-executor", daemon=True)
+        self.thread.start()
+
+    def submit(self, command, timeout=None, on_line=None):
+        """Start a command and return a Future of (stdout, stderr, returncode).
+
+        The future has a `job_id` attribute that can be passed to cancel().
+        """
+        job_id = next(self.counter)
+        timeout = self.timeout if timeout is None else timeout
+        future = asyncio.run_coroutine_threadsafe(self._run(job_id, command, timeout, on_line), self.loop)
+        future.job_id = job_id
+        self.jobs[job_id] = future
+        future.add_done_callback(lambda _: self.jobs.pop(job_id, None))
+        return future
+
+    def run(self, command, timeout=None, on_line=None):
+        """Run a command and wait for (stdout, stderr, returncode).
+
+        Raises CommandTimeout or CommandCancelled.
+        """
+        future = self.submit(command, timeout, on_line)
+        try:
+            while True:
+                try:
+                    return future.result(timeout=0.1)
+                except concurrent.futures.TimeoutError:
+                    # Poll so Ctrl+C still reaches the waiting thread
+                    continue
+        except concurrent.futures.CancelledError:
+            raise CommandCancelled(command)
+        except KeyboardInterrupt:
+            future.cancel()
+            raise CommandCancelled(command)
+
+    def cancel(self, job_id=None):
+        """Cancel one running command, or all of them. Returns how many were cancelled."""
+        futures = [self.jobs[job_id]] if job_id in self.jobs else \
+            list(self.jobs.values()) if job_id is None else []
+        return sum(1 for future in futures if future.cancel())
+
+    def running(self):
+        return len(self.jobs)
+
+    async def _run(self, job_id, command, timeout, on_line):
+        if self.semaphore is None:
+            # Created here so it belongs to the executor's own loop
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        async with self.semaphore:
+            process = await asyncio.create_subprocess_shell(
+                command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = [], []
+            output = asyncio.gather(
+                self._read_lines(process.stdout, stdout, on_line),
+                self._read_lines(process.stderr, stderr, on_line),
+                process.wait()
+            )
+            # Mark the result as seen so a cancelled run doesn't log a warning
+            output.add_done_callback(lambda f: f.cancelled() or f.exception())
+            try:
+                await asyncio.wait_for(output, timeout)
+            except asyncio.TimeoutError:
+                self._kill_tree(process)
+                await process.wait()
+                raise CommandTimeout(f"Command timed out after {timeout} seconds.")
+            except asyncio.CancelledError:
+                self._kill_tree(process)
+                raise
+            return "".join(stdout), "".join(stderr), process.returncode
+
+    async def _read_lines(self, stream, lines, on_line):
+        async for raw in stream:
+            line = raw.decode('utf-8', errors='replace')
+            lines.append(line)
+            if on_line:
+                on_line(line.rstrip('\r\n'))
+
+    def _kill_tree(self, process):
+        # With shell=True the real command is a child of the shell, so kill
+        # the whole tree rather than just the shell
+        try:
+            import psutil
+            parent = psutil.Process(process.pid)
+            for child in parent.children(recursive=True):
+                try:
+                    child.kill()
+                except psutil.NoSuchProcess:
+                    pass
+        except Exception:
+            pass
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared executor, started the first time a command needs it."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = CommandExecutor()
+        return _executor
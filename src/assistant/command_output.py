@@ -0,0 +1,67 @@
+PREFIX = "Command output:"
+# Command output read out in all; the rest is only shown
+MAX_SPOKEN_LINES = 5
+
+
+def spoken_output(response, skip=0, max_lines=MAX_SPOKEN_LINES):
+    """The part of a command's output to read out.
+
+    Skips the first `skip` non-empty lines (already spoken) and stops
+    after `max_lines` in all, saying how many more are on screen.
+    """
+    output = response[len(PREFIX):] if response.startswith(PREFIX) else response
+    lines = [line for line in output.splitlines() if line.strip()]
+    end = max(skip, max_lines)
+    spoken = lines[skip:end]
+    if len(lines) > end:
+        spoken.append(f"{len(lines) - end} more lines are on screen.")
+    return "\n".join(spoken)
+
+
+class StreamedResponse(str):
+    """A command's response whose output was already partly shown or spoken.
+
+    `printed` is True when every line was already printed, and
+    `spoken_lines` says how many non-empty output lines were read out, so
+    speak() only has to handle the rest.
+    """
+
+    printed = False
+    spoken_lines = 0
+
+
+class OutputStreamer:
+    """Line sink for execute_basic_command's `on_line`.
+
+    Prints the first `max_printed` lines (all of them if None) through
+    `print_line` and reads the first `max_spoken` out through `say` as
+    they arrive, so a long-running command is heard and seen early.
+    Called from the command executor's thread.
+    """
+
+    def __init__(self, print_line=None, say=None, max_printed=None, max_spoken=3):
+        self.print_line = print_line
+        self.say = say
+        self.max_printed = max_printed
+        self.max_spoken = max_spoken
+        self.lines = 0
+        self.spoken = 0
+
+    def __call__(self, line):
+        if not line.strip():
+            return
+        self.lines += 1
+        if self.print_line and (self.max_printed is None or self.lines <= self.max_printed):
+            self.print_line(line)
+        if self.say and self.spoken < self.max_spoken:
+            self.say(line)
+            self.spoken += 1
+
+    def finish(self, response):
+        """Wrap the final response so speak() doesn't repeat what was already streamed."""
+        if not self.lines or not isinstance(response, str):
+            return response
+        response = StreamedResponse(response)
+        response.printed = self.print_line is not None and self.max_printed is None
+        response.spoken_lines = self.spoken
+        return response
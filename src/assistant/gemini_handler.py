@@ -1,17 +1,37 @@
 import google.generativeai as genai
 from pathlib import Path
 import PIL.Image
+import json
 import os # For environment variables, a good practice for API keys
+import threading
+import time
+
+from .llm_stream import stream_text, speak_stream
+from .response_cache import ResponseCache
+from .llm_client import LLMClient
+from .chat_history import ChatHistory
 
 # It's good practice to load API keys from environment variables
 # Or pass it directly as you are doing.
 # For this example, I'll keep your direct pass-through but add a note.
 # API_KEY = os.getenv("GEMINI_API_KEY")
 
+MODEL_CACHE_PATH = Path.home() / ".voice_assistant" / "gemini_models.json"
+MODEL_CACHE_TTL = 24 * 60 * 60  # Seconds before the model list is fetched again
+
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+]
+
 class GeminiHandler:
-    def __init__(self, api_key):
+    def __init__(self, api_key, warm_up=False, cache_path=MODEL_CACHE_PATH, cache_ttl=MODEL_CACHE_TTL,
+                 response_cache=None, cache_responses=True, client=None, history_budget=4000):
         if not api_key:
             raise ValueError("API key must be provided.")
+        # Only stores the key; no network traffic until the first request
         self.configure_gemini(api_key)
         
         # --- Model Names ---
@@ -20,49 +40,155 @@ class GeminiHandler:
         # Recommended vision-capable model (gemini-1.5-pro-latest is also vision capable)
         # Or use 'gemini-1.5-flash-latest' for faster/cheaper vision tasks
         self.vision_model_name = 'gemini-1.5-pro-latest' # or 'gemini-1.5-flash-latest'
+        # Part of the response cache key, so changing it never serves stale replies
+        self.generation_config = None
 
-        try:
-            # List available models (optional, for debugging)
-            print("Available models for generateContent:")
-            for m in genai.list_models():
-                if 'generateContent' in m.supported_generation_methods:
-                    print(f"- {m.name}")
-            print("-" * 20)
-            
-            # Initialize the primary model (for text and potentially vision)
-            self.model = genai.GenerativeModel(
-                self.text_model_name,
-                safety_settings=[
-                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                ]
-                # You can also add generation_config here, e.g.:
-                # generation_config=genai.types.GenerationConfig(
-                #     candidate_count=1,
-                #     temperature=0.7,
-                # )
-            )
-            
-            # Initialize a separate model for vision if you want to use a different one (e.g., flash)
-            # If self.text_model_name is already vision capable (like 1.5-pro), you can reuse self.model
-            if self.text_model_name == self.vision_model_name:
-                self.vision_model = self.model
-            else:
-                self.vision_model = genai.GenerativeModel(self.vision_model_name)
-
-            # Initialize chat
-            self.chat = self.model.start_chat(history=[])
-            print(f"Successfully initialized model: {self.text_model_name}")
-            if self.text_model_name != self.vision_model_name:
-                 print(f"Successfully initialized vision model: {self.vision_model_name}")
+        # Replies to the stateless calls (get_response, stream_response,
+        # generate_code) are cached; chat turns never are
+        if response_cache is None and cache_responses:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache
+
+        # Every request goes through the client: bounded concurrency, rate
+        # limiting, retries on 429/5xx and coalescing of identical prompts
+        self.client = client or LLMClient()
+
+        # Chat turns are sent from our own history rather than a growing
+        # ChatSession, so each request stays within history_budget tokens
+        self.history = ChatHistory(budget=history_budget)
+        self.compaction = None
+
+        # The model catalogue is cached on disk and models are created on
+        # first use, so constructing the handler costs no round-trips
+        self.cache_path = Path(cache_path)
+        self.cache_ttl = cache_ttl
+        self._model = None
+        self._vision_model = None
+        self.lock = threading.Lock()
+
+        if warm_up:
+            self.warm_up()
 
+    @property
+    def model(self):
+        with self.lock:
+            if self._model is None:
+                try:
+                    self._model = genai.GenerativeModel(
+                        self.text_model_name,
+                        safety_settings=SAFETY_SETTINGS,
+                        # Set self.generation_config before first use, e.g.:
+                        # genai.types.GenerationConfig(candidate_count=1, temperature=0.7)
+                        generation_config=self.generation_config
+                    )
+                except Exception as e:
+                    print(f"Model initialization error: {str(e)}")
+                    raise
+            return self._model
+
+    @property
+    def vision_model(self):
+        # If the text model is already vision capable (like 1.5-pro), reuse it
+        if self.text_model_name == self.vision_model_name:
+            return self.model
+        with self.lock:
+            if self._vision_model is None:
+                self._vision_model = genai.GenerativeModel(self.vision_model_name)
+            return self._vision_model
+
+    def pin_fact(self, fact):
+        """Keep a fact in every chat request, however long the conversation gets."""
+        self.history.pin(fact)
+
+    def remember_fact(self, message):
+        # "Remember that my sister is called Anna" pins the fact itself
+        lowered = message.lower()
+        if lowered.startswith("remember that "):
+            self.pin_fact(message[len("remember that "):].strip())
+
+    def start_compaction(self):
+        """The compaction task running on this loop, started if the history is over budget."""
+        loop = asyncio.get_running_loop()
+        if self.compaction is None or self.compaction.done() or self.compaction.get_loop() is not loop:
+            if not self.history.over_budget():
+                return None
+            self.compaction = loop.create_task(self.compact_history())
+        return self.compaction
+
+    def schedule_compaction(self):
+        """Summarize old turns in the background once the history is over budget."""
+        self.start_compaction()
+
+    async def wait_for_budget(self):
+        """Finish compacting before a chat request is sent.
+
+        A background compaction is cancelled when its loop closes, as with
+        one asyncio.run() per request, so this is what keeps the history
+        within budget.
+        """
+        compaction = self.start_compaction()
+        if compaction is not None:
+            # Shielded so a cancelled request doesn't abandon the summary
+            await asyncio.shield(compaction)
+
+    async def compact_history(self):
+        turns = self.history.overflow()
+        if not turns:
+            return
+        transcript = "\n".join(f"{'User' if role == 'user' else 'Assistant'}: {text}" for role, text in turns)
+        prompt = (
+            "Update the running summary of a conversation between a user and a voice assistant. "
+            f"Keep it under {self.history.summary_tokens * 3 // 4} words and keep names, numbers and decisions. "
+            "Return only the summary.\n\n"
+            f"Current summary:\n{self.history.summary or '(none)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+        try:
+            response = await self.client.call(lambda: self.model.generate_content_async(prompt))
+            summary = response.text.strip()
         except Exception as e:
-            print(f"Model initialization error: {str(e)}")
-            # This error could be due to incorrect API key, model not available for the key,
-            # network issues, or issues with the safety settings structure.
-            raise
+            print(f"Chat summary error: {str(e)}")
+            summary = self.history.fallback_summary(turns)
+        self.history.compact(len(turns), summary)
+
+    def list_models(self, refresh=False):
+        """Names of models that support generateContent.
+
+        Read from the on-disk cache while it is younger than `cache_ttl`;
+        otherwise fetched from the API and written back.
+        """
+        if not refresh:
+            try:
+                cached = json.loads(self.cache_path.read_text(encoding='utf-8'))
+                if time.time() - cached['fetched'] < self.cache_ttl:
+                    return cached['models']
+            except (OSError, ValueError, KeyError):
+                pass
+
+        models = [m.name for m in genai.list_models()
+                  if 'generateContent' in m.supported_generation_methods]
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_text(json.dumps({'fetched': time.time(), 'models': models}), encoding='utf-8')
+        except OSError as e:
+            print(f"Could not cache model list: {str(e)}")
+        return models
+
+    def warm_up(self):
+        """Refresh the model list and open the API connection in the background."""
+        def run():
+            try:
+                models = self.list_models()
+                if models and f"models/{self.text_model_name}" not in models:
+                    print(f"Warning: {self.text_model_name} is not in the available model list")
+                # A token count is the cheapest request that sets up the connection
+                self.model.count_tokens("hello")
+            except Exception as e:
+                print(f"Gemini warm-up error: {str(e)}")
+
+        thread = threading.Thread(target=run, name="gemini-warm-up", daemon=True)
+        thread.start()
+        return thread
 
     def configure_gemini(self, api_key):
         genai.configure(api_key=api_key)
@@ -70,11 +196,27 @@ class GeminiHandler:
     # Note: The google-generativeai library's generate_content is synchronous.
     # If you use this in an asyncio application, it will block.
     # For true async, you'd typically use asyncio.to_thread or if the library offers an async version.
+    def cached_reply(self, kind, prompt):
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(self.text_model_name, self.generation_config, kind, prompt)
+
+    def cache_reply(self, kind, prompt, text):
+        if self.response_cache is not None and text:
+            self.response_cache.put(self.text_model_name, self.generation_config, kind, prompt, text)
+
     async def get_response(self, prompt: str):
+        cached = self.cached_reply('response', prompt)
+        if cached is not None:
+            return cached
         try:
             # For single turn, use generate_content. For conversational, use self.chat.send_message
-            response = await self.model.generate_content_async(prompt) # Using async version
+            response = await self.client.call(
+                lambda: self.model.generate_content_async(prompt), # Using async version
+                key=('response', prompt)  # Exact prompt: only true duplicates share a request
+            )
             # response = self.model.generate_content(prompt) # Synchronous version
+            self.cache_reply('response', prompt, response.text)
             return response.text
         except Exception as e:
             print(f"Generation error in get_response: {str(e)}")
@@ -87,9 +229,16 @@ class GeminiHandler:
             return "I encountered an error during generation. Please try again."
 
     async def send_chat_message(self, message: str):
+        # Never cached: the reply depends on the conversation so far
+        self.remember_fact(message)
         try:
-            response = await self.chat.send_message_async(message) # Using async version
-            # response = self.chat.send_message(message) # Synchronous version
+            await self.wait_for_budget()
+            contents = self.history.contents(message)
+            response = await self.client.call(lambda: self.model.generate_content_async(contents)) # Using async version
+            # response = self.model.generate_content(contents) # Synchronous version
+            self.history.add('user', message)
+            self.history.add('model', response.text)
+            self.schedule_compaction()
             return response.text
         except Exception as e:
             print(f"Chat error: {str(e)}")
@@ -100,15 +249,66 @@ class GeminiHandler:
                 pass
             return "I encountered an error in chat. Please try again."
 
+    async def stream_response(self, prompt: str):
+        """Like get_response, but yields the reply in chunks as they are generated."""
+        cached = self.cached_reply('response', prompt)
+        if cached is not None:
+            yield cached
+            return
+        try:
+            chunks = self.client.stream(lambda: self.model.generate_content_async(prompt, stream=True))
+            parts = []
+            async for text in stream_text(chunks):
+                parts.append(text)
+                yield text
+            self.cache_reply('response', prompt, "".join(parts))
+        except Exception as e:
+            print(f"Generation error in stream_response: {str(e)}")
+            yield "I encountered an error during generation. Please try again."
+
+    async def stream_chat_message(self, message: str):
+        """Like send_chat_message, but yields the reply in chunks as they are generated."""
+        self.remember_fact(message)
+        try:
+            await self.wait_for_budget()
+            contents = self.history.contents(message)
+            chunks = self.client.stream(lambda: self.model.generate_content_async(contents, stream=True))
+            parts = []
+            async for text in stream_text(chunks):
+                parts.append(text)
+                yield text
+            self.history.add('user', message)
+            self.history.add('model', "".join(parts))
+            self.schedule_compaction()
+        except Exception as e:
+            print(f"Chat error: {str(e)}")
+            yield "I encountered an error in chat. Please try again."
+
+    async def speak_response(self, prompt: str, say, chat=False):
+        """Stream a reply and hand each finished sentence to `say` (e.g. SpeechWorker.say).
+
+        The first sentence is spoken while the rest is still being
+        generated. Returns the whole reply.
+        """
+        chunks = self.stream_chat_message(prompt) if chat else self.stream_response(prompt)
+        return await speak_stream(chunks, say)
+
     async def generate_code(self, prompt: str):
+        cached = self.cached_reply('code', prompt)
+        if cached is not None:
+            return cached
         try:
             # Using async version
-            response = await self.model.generate_content_async(
-                f"Write Python code for the following task or concept: {prompt}. "
-                "Return only the Python code block, with comments where necessary. "
-                "Do not include any explanatory text before or after the code block."
+            response = await self.client.call(
+                lambda: self.model.generate_content_async(
+                    f"Write Python code for the following task or concept: {prompt}. "
+                    "Return only the Python code block, with comments where necessary. "
+                    "Do not include any explanatory text before or after the code block."
+                ),
+                key=('code', prompt)
             )
             # response = self.model.generate_content(...) # Synchronous version
+            self.cache_reply('code', prompt, response.text)
             return response.text
         except Exception as e:
             print(f"Code generation error: {str(e)}")
@@ -130,7 +330,7 @@ class GeminiHandler:
             
             # Use the initialized vision model
             # The content can be a list: [text_prompt, image_object, text_prompt_after_image (optional)]
-            response = await self.vision_model.generate_content_async([prompt, image]) # Using async version
+            response = await self.client.call(lambda: self.vision_model.generate_content_async([prompt, image])) # Using async version
             # response = self.vision_model.generate_content([prompt, image]) # Synchronous version
             return response.text
         except FileNotFoundError:
@@ -159,6 +359,10 @@ async def main():
 
     try:
         handler = GeminiHandler(api_key=api_key)
+        print("Available models for generateContent:")
+        for name in handler.list_models():
+            print(f"- {name}")
+        print("-" * 20)
 
         # Test text generation
         print("\n--- Testing Text Generation ---")
@@ -172,7 +376,7 @@ async def main():
         print(f"User: Hello! What can you do?\nGemini: {chat_response1}")
         chat_response2 = await handler.send_chat_message("Tell me a fun fact about space.")
         print(f"User: Tell me a fun fact about space.\nGemini: {chat_response2}")
-        print(f"Chat History Inspect: {handler.chat.history}")
+        print(f"Chat History Inspect: {handler.history.contents()}")
 
 
         # Test code generation
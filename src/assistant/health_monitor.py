@@ -3,6 +3,14 @@ from datetime import datetime, timedelta
 import random  # Importing random module to use in get_health_tips method
 
 class HealthMonitor:
+    tips = [
+        "Remember to maintain good posture, boss!",
+        "Stay hydrated - drink some water!",
+        "Time for some eye exercises - look at something 20 feet away for 20 seconds.",
+        "Stand up and stretch for a minute.",
+        "Take deep breaths and relax your shoulders."
+    ]
+
     def __init__(self):
         self.last_break = datetime.now()
         self.work_duration = timedelta(minutes=45)
@@ -19,11 +27,4 @@ class HealthMonitor:
         return f"Taking a {self.break_duration.seconds//60} minute break. Look away from the screen!"
 
     def get_health_tips(self):
-        tips = [
-            "Remember to maintain good posture, boss!",
-            "Stay hydrated - drink some water!",
-            "Time for some eye exercises - look at something 20 feet away for 20 seconds.",
-            "Stand up and stretch for a minute.",
-            "Take deep breaths and relax your shoulders."
-        ]
-        return random.choice(tips)
\ No newline at end of file
+        return random.choice(self.tips)
\ No newline at end of file
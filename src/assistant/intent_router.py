@@ -0,0 +1,61 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+# How a rule's phrase has to appear in the command
+KEYWORD = 'keyword'  # anywhere, as whole words
+FIRST = 'first'      # at the very start of the command
+EXACT = 'exact'      # the whole command
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class IntentRouter:
+    """Map a command to an intent with a token trie compiled from rules.
+
+    Each rule is ``(intent, priority, mode, phrases)``. All phrases go
+    into one trie keyed by word, so routing is a single scan over the
+    command's tokens no matter how many rules there are. Phrases match
+    whole words only ("info" doesn't match "information"), and when
+    several rules match, the highest priority wins, then the earliest
+    and longest match.
+    """
+
+    def __init__(self, rules, default=None):
+        self.default = default
+        self.trie = {}
+        for intent, priority, mode, phrases in rules:
+            for phrase in phrases:
+                self.add(intent, priority, mode, phrase)
+
+    def add(self, intent, priority, mode, phrase):
+        tokens = tokenize(phrase)
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        # None can't clash with a token, so it marks the end of a phrase
+        node.setdefault(None, []).append((priority, mode, intent, phrase, len(tokens)))
+
+    def route(self, command):
+        """Return (intent, matched phrase) for a command."""
+        tokens = tokenize(command)
+        best = None
+        best_key = None
+        for start in range(len(tokens)):
+            node = self.trie
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                for priority, mode, intent, phrase, length in node.get(None, ()):
+                    if mode == FIRST and start != 0:
+                        continue
+                    if mode == EXACT and length != len(tokens):
+                        continue
+                    key = (priority, -start, length)
+                    if best_key is None or key > best_key:
+                        best_key = key
+                        best = (intent, phrase)
+        return best if best is not None else (self.default, None)
@@ -0,0 +1,168 @@
+import asyncio
+import random
+import threading
+import time
+
+
+def status_code(error):
+    """HTTP status of an API error, if it has one (google.api_core errors set `code`)."""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code
+    return getattr(error, 'status_code', None)
+
+
+def is_retryable(error):
+    code = status_code(error)
+    return code is not None and (code == 429 or 500 <= code < 600)
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Take a token if one is available; otherwise return seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self.take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class LLMClient:
+    """Shared limits for calls to a rate-limited LLM API.
+
+    - At most `max_concurrent` requests are in flight at once; a streamed
+      reply keeps its slot until its last chunk has arrived.
+    - Requests start at `rate` per second on average (token bucket,
+      bursts of up to `burst`).
+    - Identical requests made while one is already in flight wait for
+      that one instead of sending their own (single flight).
+    - 429 and 5xx errors are retried up to `max_retries` times with
+      exponential backoff and full jitter, so a burst of callers that hit
+      the quota together don't all retry together.
+
+    Requests run on the client's own background loop, started on first
+    use, so the limits hold across callers on different event loops, such
+    as one asyncio.run() per request.
+    """
+
+    def __init__(self, max_concurrent=4, rate=2.0, burst=4, max_retries=4, base_delay=0.5, max_delay=20.0):
+        self.max_concurrent = max_concurrent
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.loop = None
+        self.semaphore = None
+        self.inflight = {}
+        self.start_lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the client's loop; returns a concurrent Future."""
+        with self.start_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="llm-client", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    async def call(self, request, key=None):
+        """Await `request()` (a coroutine function) within the limits.
+
+        Calls with the same non-None `key` share one request while it is
+        in flight. Raises the last error once retries are used up.
+        """
+        return await asyncio.wrap_future(self.submit(self._call(request, key)))
+
+    async def stream(self, request):
+        """Like call() for a streamed response: yields its chunks as they arrive."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The caller's loop is already closed
+                pass
+
+        future = self.submit(self._stream(request, put))
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == 'error':
+                    raise value
+                if kind == 'done':
+                    return
+                yield value
+        finally:
+            future.cancel()
+
+    async def _call(self, request, key):
+        if key is not None and key in self.inflight:
+            self.coalesced += 1
+            # Shielded so one caller giving up doesn't cancel it for the others
+            return await asyncio.shield(self.inflight[key])
+
+        task = asyncio.ensure_future(self.send(request))
+        if key is not None:
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _stream(self, request, put):
+        async def consume(response):
+            async for chunk in response:
+                put(('chunk', chunk))
+
+        try:
+            await self.send(request, consume)
+        except Exception as e:
+            put(('error', e))
+        else:
+            put(('done', None))
+
+    async def send(self, request, consume=None):
+        if self.semaphore is None:
+            # Created here so it belongs to the client's own loop
+            self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                self.requests += 1
+                try:
+                    response = await request()
+                except Exception as e:
+                    if not is_retryable(e) or attempt == self.max_retries:
+                        raise
+                else:
+                    if consume is not None:
+                        # Only the request itself is retried, never a half-read stream
+                        await consume(response)
+                    return response
+            self.retries += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    def stats(self):
+        return (f"LLM client: {self.requests} requests sent, {self.coalesced} coalesced, "
+                f"{self.retries} retries")
@@ -0,0 +1,25 @@
+from .speech_worker import SentenceSegmenter
+
+
+async def stream_text(response):
+    """Yield the text of each chunk of a streamed generate_content response."""
+    async for chunk in response:
+        text = chunk.text
+        if text:
+            yield text
+
+
+async def speak_stream(chunks, say):
+    """Pass each sentence of a streamed reply to `say` as soon as it is complete.
+
+    `chunks` is an async iterator of text. Returns the whole reply.
+    """
+    segmenter = SentenceSegmenter()
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        for sentence in segmenter.feed(chunk):
+            say(sentence)
+    for sentence in segmenter.flush():
+        say(sentence)
+    return "".join(parts)
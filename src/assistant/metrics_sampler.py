@@ -0,0 +1,155 @@
+import threading
+import time
+
+import numpy as np
+
+from .process_table import ProcessTable
+
+
+class TimeSeries:
+    """Fixed-size ring buffer of timestamped samples."""
+
+    def __init__(self, capacity):
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.pos = 0
+        self.count = 0
+
+    def append(self, timestamp, value):
+        self.times[self.pos] = timestamp
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def latest(self):
+        if self.count == 0:
+            return None
+        return float(self.values[self.pos - 1])
+
+    def window(self, seconds, now=None):
+        """Values recorded in the last `seconds` seconds, in no particular order."""
+        now = time.monotonic() if now is None else now
+        times = self.times[:self.count]
+        return self.values[:self.count][times >= now - seconds]
+
+    def stats(self, seconds):
+        """(min, avg, max) over the last `seconds` seconds, or None without samples."""
+        values = self.window(seconds)
+        if len(values) == 0:
+            return None
+        return float(values.min()), float(values.mean()), float(values.max())
+
+
+class MetricsSampler(threading.Thread):
+    """Background thread recording system metrics at a fixed rate.
+
+    CPU, memory and disk usage (percent) and network send/receive rates
+    (bytes per second) go into TimeSeries ring buffers covering `history`
+    seconds. Status queries read these instead of calling psutil
+    themselves, so they never block and CPU figures are measured over a
+    real interval instead of "since whoever called last".
+    """
+
+    METRICS = ('cpu', 'memory', 'disk', 'net_sent', 'net_recv')
+
+    def __init__(self, interval=1.0, history=3600, process_interval=2.0):
+        super().__init__(name="metrics-sampler", daemon=True)
+        self.interval = interval
+        self.process_interval = process_interval
+        self.processes = None
+        capacity = max(1, int(history / interval))
+        self.series = {name: TimeSeries(capacity) for name in self.METRICS}
+        self.snapshot = {}
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        import psutil
+        # The first cpu_percent() call only sets the baseline
+        psutil.cpu_percent(interval=None)
+        last_net = psutil.net_io_counters()
+        last_time = time.monotonic()
+        wait = min(0.1, self.interval)
+
+        while not self.stop_event.wait(wait):
+            wait = self.interval
+            try:
+                now = time.monotonic()
+                cpu = psutil.cpu_percent(interval=None)
+                memory = psutil.virtual_memory()
+                disk = psutil.disk_usage('/')
+                net = psutil.net_io_counters()
+            except Exception as e:
+                print(f"Metrics sampling error: {str(e)}")
+                continue
+
+            elapsed = max(now - last_time, 1e-6)
+            with self.lock:
+                self.series['cpu'].append(now, cpu)
+                self.series['memory'].append(now, memory.percent)
+                self.series['disk'].append(now, disk.percent)
+                self.series['net_sent'].append(now, (net.bytes_sent - last_net.bytes_sent) / elapsed)
+                self.series['net_recv'].append(now, (net.bytes_recv - last_net.bytes_recv) / elapsed)
+                self.snapshot = {'memory': memory, 'disk': disk, 'net': net}
+            last_net, last_time = net, now
+            self.ready.set()
+            self.refresh_processes(now)
+
+    def refresh_processes(self, now):
+        table = self.processes
+        if table is None:
+            return
+        # Refresh every tick until the table has CPU deltas, then back off;
+        # walking every process is the most expensive thing sampled here
+        if table.ready.is_set() and now - self.last_process_refresh < self.process_interval:
+            return
+        try:
+            table.refresh()
+        except Exception as e:
+            print(f"Process sampling error: {str(e)}")
+        self.last_process_refresh = now
+
+    def track_processes(self):
+        """Start keeping a process table, and return it.
+
+        Processes are only walked once something has asked for them.
+        """
+        with self.lock:
+            if self.processes is None:
+                self.processes = ProcessTable()
+                self.last_process_refresh = 0.0
+            return self.processes
+
+    def stop(self):
+        self.stop_event.set()
+
+    def wait_ready(self, timeout=2):
+        return self.ready.wait(timeout)
+
+    def latest(self, metric):
+        with self.lock:
+            return self.series[metric].latest()
+
+    def stats(self, metric, seconds):
+        with self.lock:
+            return self.series[metric].stats(seconds)
+
+    def latest_snapshot(self):
+        """Most recent raw psutil results (memory, disk, net counters)."""
+        with self.lock:
+            return dict(self.snapshot)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    """Shared sampler, started the first time anyone asks for metrics."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = MetricsSampler()
+            _sampler.start()
+        return _sampler
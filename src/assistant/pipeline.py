@@ -0,0 +1,194 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Stage(threading.Thread):
+    """One step of the voice pipeline, running on its own thread.
+
+    A stage takes items from `inbox`, runs `body` on them and passes any
+    non-None result to `outbox`. A stage without an inbox is a source and
+    calls `body()` in a loop. Puts block while the next stage is busy
+    (backpressure), but every wait wakes up regularly so the stage exits
+    promptly once `stop_event` is set. Consecutive errors back off
+    exponentially, up to `max_backoff` seconds, so a failing microphone
+    doesn't spin a core.
+    """
+
+    max_backoff = 5.0
+
+    def __init__(self, name, body, inbox, outbox, stop_event, on_error=None):
+        super().__init__(name=f"pipeline-{name}", daemon=True)
+        self.body = body
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop_event = stop_event
+        self.on_error = on_error
+        self.failures = 0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.inbox is None:
+                item = None
+            else:
+                try:
+                    item = self.inbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+            try:
+                result = self.body() if self.inbox is None else self.body(item)
+            except Exception as e:
+                print(f"Error in {self.name}: {str(e)}")
+                if self.on_error:
+                    self.on_error(e)
+                self.failures += 1
+                self.stop_event.wait(min(0.1 * 2 ** (self.failures - 1), self.max_backoff))
+                continue
+            self.failures = 0
+
+            if result is not None and self.outbox is not None:
+                self.put(result)
+
+    def put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.outbox.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+class VoicePipeline:
+    """Concurrent capture -> auth -> ASR -> dispatch -> TTS loop.
+
+    Every stage runs on its own thread and stages are connected by
+    bounded queues, so the microphone keeps capturing while the previous
+    utterance is still being recognized, handled or spoken.
+
+    With `parallel_auth` (the default) voice authentication and speech
+    recognition run side by side on a small worker pool, so an authorized
+    command waits for the slower of the two instead of both in turn.
+
+    Cancel commands skip the dispatch queue and call `cancel` straight
+    from the recognition stage, so they can stop a command that is still
+    running in the dispatch stage.
+
+    With `ignore_during_playback`, utterances that started while the
+    assistant was speaking (see CapturedAudio.during_playback) are only
+    acted on if they are cancel commands; anything else is likely the
+    assistant's own voice.
+    """
+
+    exit_commands = ("exit", "goodbye")
+    cancel_commands = ("cancel", "cancel command", "stop command")
+    farewell = "Goodbye!"
+
+    def __init__(self, listen, recognize, dispatch, speak, verify=None,
+                 on_response=None, on_error=None, maxsize=2, parallel_auth=True, cancel=None,
+                 ignore_during_playback=False):
+        self.listen = listen
+        self.recognize = recognize
+        self.cancel = cancel
+        self.dispatch = dispatch
+        self.speak = speak
+        self.verify = verify
+        self.on_response = on_response
+        self.ignore_during_playback = ignore_during_playback
+        self.closing = False
+        self.stop_event = threading.Event()
+        self.executor = None
+
+        if verify is not None and parallel_auth:
+            self.executor = ThreadPoolExecutor(max_workers=2 * maxsize, thread_name_prefix="pipeline-auth")
+            recognition = [("auth+asr", self._authenticate_and_recognize)]
+        else:
+            recognition = [("auth", self._authenticate), ("asr", self._recognize)]
+
+        bodies = [("capture", self._capture)] + recognition + [
+            ("dispatch", self._dispatch),
+            ("tts", self._speak),
+        ]
+        queues = [queue.Queue(maxsize=maxsize) for _ in bodies[1:]]
+        self.stages = []
+        for i, (name, body) in enumerate(bodies):
+            inbox = queues[i - 1] if i > 0 else None
+            outbox = queues[i] if i < len(queues) else None
+            self.stages.append(Stage(name, body, inbox, outbox, self.stop_event, on_error))
+
+    def _capture(self):
+        if self.closing:
+            self.stop_event.wait(0.1)
+            return None
+        return self.listen()
+
+    def _authenticate(self, audio):
+        if self.verify is None or self.verify(audio):
+            return audio
+        print("Voice not recognized. Command ignored.")
+        return None
+
+    def _authenticate_and_recognize(self, audio):
+        # Both only read the same immutable audio, so they can overlap
+        auth = self.executor.submit(self.verify, audio)
+        asr = self.executor.submit(self.recognize, audio)
+        if auth.result():
+            return self._intercept(asr.result(), audio)
+        # Skip recognition if it hasn't started yet; otherwise drop its result
+        asr.cancel()
+        print("Voice not recognized. Command ignored.")
+        return None
+
+    def _recognize(self, audio):
+        return self._intercept(self.recognize(audio), audio)
+
+    def _intercept(self, command, audio):
+        # "cancel" has to act on the command that is running now, so it
+        # can't wait in the dispatch queue behind it
+        if command in self.cancel_commands and self.cancel is not None:
+            response = self.cancel()
+            if response and self.on_response:
+                self.on_response(response)
+            if response:
+                self.speak(response)
+            return None
+        if command and self.ignore_during_playback and getattr(audio, 'during_playback', False):
+            print(f"Ignored '{command}': heard while speaking")
+            return None
+        return command
+
+    def _dispatch(self, command):
+        if not command or self.closing:
+            return None
+        if command in self.exit_commands:
+            self.closing = True
+            return self.farewell
+        response = self.dispatch(command)
+        if response and self.on_response:
+            self.on_response(response)
+        return response
+
+    def _speak(self, text):
+        self.speak(text)
+        if self.closing and text is self.farewell:
+            self.stop_event.set()
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def wait(self, timeout=None):
+        """Block until the pipeline is stopped. Returns False on timeout."""
+        return self.stop_event.wait(timeout)
+
+    def join(self, timeout=5):
+        for stage in self.stages:
+            stage.join(timeout)
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def is_running(self):
+        return not self.stop_event.is_set()
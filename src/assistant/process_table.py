@@ -0,0 +1,64 @@
+import heapq
+import threading
+import time
+
+
+class ProcessTable:
+    """Running processes with CPU usage measured between refreshes.
+
+    Entries are keyed by (pid, create time) so a reused pid isn't mistaken
+    for the process that had it before. Each refresh compares a process's
+    total CPU time with the previous refresh, so a process only gets a CPU
+    figure from its second sighting on; psutil's own first
+    cpu_percent() reading per process is always 0.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.last_refresh = None
+        self.refreshes = 0
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+
+    def refresh(self):
+        import psutil
+        now = time.monotonic()
+        elapsed = now - self.last_refresh if self.last_refresh is not None else None
+        entries = {}
+        for proc in psutil.process_iter(['name', 'create_time', 'cpu_times', 'memory_percent']):
+            if proc.pid == 0:
+                # The idle "process" on Windows; its CPU time is idle time
+                continue
+            info = proc.info
+            cpu_times = info['cpu_times']
+            if cpu_times is None:
+                # Access denied
+                continue
+            key = (proc.pid, info['create_time'])
+            total = cpu_times.user + cpu_times.system
+            previous = self.entries.get(key)
+            cpu = None
+            if previous is not None and elapsed:
+                cpu = max(0.0, (total - previous['total']) / elapsed * 100)
+            entries[key] = {
+                'name': info['name'],
+                'total': total,
+                'cpu': cpu,
+                'memory': info['memory_percent'] or 0.0,
+            }
+
+        with self.lock:
+            self.entries = entries
+        self.last_refresh = now
+        self.refreshes += 1
+        if self.refreshes >= 2:
+            self.ready.set()
+
+    def wait_ready(self, timeout=5):
+        return self.ready.wait(timeout)
+
+    def top(self, count=5, key='cpu'):
+        """The `count` processes using the most CPU (or memory), highest first."""
+        with self.lock:
+            candidates = [entry for entry in self.entries.values() if entry[key] is not None]
+        return heapq.nlargest(count, candidates, key=lambda entry: entry[key])
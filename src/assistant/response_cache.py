@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Sentence punctuation at the end of a word; symbols inside words or
+# between digits ("C++", "2+2", "node.js") change the meaning, so they stay
+TRAILING_PUNCTUATION = re.compile(r"[.,!?;:]+(?=\s|$)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt):
+    """Fold case, whitespace and sentence punctuation so trivial rephrasings match."""
+    return WHITESPACE.sub(" ", TRAILING_PUNCTUATION.sub("", prompt.lower())).strip()
+
+
+class ResponseCache:
+    """Persistent cache of LLM replies to stateless prompts.
+
+    Entries are keyed by model name, generation config, the kind of call
+    (e.g. "response" or "code") and the normalized prompt, and stored in
+    a SQLite file. Entries older than `ttl` seconds are treated as
+    misses, and once there are more than `max_entries` the least recently
+    used ones are dropped. Never use it for chat turns: their reply
+    depends on the conversation so far, not just the prompt.
+    """
+
+    def __init__(self, path=None, max_entries=1000, ttl=7 * 24 * 60 * 60):
+        self.path = path or os.path.join(
+            os.path.expanduser('~'), '.voice_assistant', 'response_cache.sqlite3'
+        )
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.db.commit()
+
+    def key(self, model, config, kind, prompt):
+        raw = json.dumps([model, config, kind, normalize_prompt(prompt)], sort_keys=True, default=repr)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, model, config, kind, prompt):
+        """Return the cached reply, or None."""
+        key = self.key(model, config, kind, prompt)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model, config, kind, prompt, response):
+        key = self.key(model, config, kind, prompt)
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self.evict(now)
+            self.db.commit()
+
+    def evict(self, now):
+        self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        self.db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return (f"Response cache: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate():.0%} hit rate), {len(self)} entries")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
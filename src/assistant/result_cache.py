@@ -0,0 +1,120 @@
+import threading
+import time
+
+from commands.system_commands import CACHE_POLICY, COMMAND_EVENTS, is_state_changing
+
+
+class ResultCache:
+    """TTL cache for the output of read-only system commands.
+
+    Each command's TTL and invalidation events come from CACHE_POLICY in
+    commands/system_commands.py. Callers only store successful runs, and
+    state-changing commands are never cached. Entries that depend on the
+    network remember the machine's addresses when they were stored and
+    are dropped on lookup if those have changed since. An optional
+    background thread re-runs entries before they expire and watches for
+    address changes too.
+    """
+
+    def __init__(self, policy=None):
+        self.policy = CACHE_POLICY if policy is None else policy
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.stop_event = threading.Event()
+
+    def policy_for(self, command):
+        words = command.split()
+        if not words or is_state_changing(command):
+            return None
+        return self.policy.get(words[0])
+
+    def get(self, command):
+        command = command.lower().strip()
+        with self.lock:
+            entry = self.entries.get(command)
+        if entry is None:
+            return None
+        expires_at, result, addresses = entry
+        if time.monotonic() >= expires_at:
+            self.discard(command, entry)
+            return None
+        if addresses is not None and self._network_addresses() != addresses:
+            self.invalidate('network')
+            return None
+        return result
+
+    def discard(self, command, entry):
+        with self.lock:
+            if self.entries.get(command) is entry:
+                del self.entries[command]
+
+    def put(self, command, result):
+        command = command.lower().strip()
+        policy = self.policy_for(command)
+        if policy is None:
+            return False
+        addresses = self._network_addresses() if 'network' in policy['events'] else None
+        with self.lock:
+            self.entries[command] = (time.monotonic() + policy['ttl'], result, addresses)
+        return True
+
+    def invalidate(self, event=None):
+        """Drop everything affected by `event`, or the whole cache if no event is given."""
+        with self.lock:
+            for command in list(self.entries):
+                policy = self.policy_for(command)
+                if event is None or policy is None or event in policy['events']:
+                    del self.entries[command]
+
+    def notify_command(self, command):
+        """Invalidate whatever a state-changing command may have changed."""
+        words = command.lower().split()
+        for event in COMMAND_EVENTS.get(words[0] if words else None, ()):
+            self.invalidate(event)
+
+    def start_refresh(self, run, interval=30):
+        """Keep cached answers warm by re-running them shortly before they expire.
+
+        `run(command)` must return (result, succeeded).
+        """
+        if self.refresh_thread is not None:
+            return
+        self.stop_event.clear()
+        self.refresh_thread = threading.Thread(
+            target=self._refresh_loop, args=(run, interval), name="result-cache-refresh", daemon=True
+        )
+        self.refresh_thread.start()
+
+    def stop_refresh(self):
+        self.stop_event.set()
+        self.refresh_thread = None
+
+    def _refresh_loop(self, run, interval):
+        addresses = self._network_addresses()
+        while not self.stop_event.wait(interval):
+            current = self._network_addresses()
+            if current != addresses:
+                addresses = current
+                self.invalidate('network')
+
+            with self.lock:
+                soon = time.monotonic() + 2 * interval
+                due = [command for command, (expires_at, _, _) in self.entries.items() if expires_at <= soon]
+            for command in due:
+                try:
+                    result, succeeded = run(command)
+                    if succeeded:
+                        self.put(command, result)
+                except Exception as e:
+                    print(f"Cache refresh error for '{command}': {str(e)}")
+
+    def _network_addresses(self):
+        try:
+            import psutil
+            return {
+                name: sorted(address.address for address in addresses)
+                for name, addresses in psutil.net_if_addrs().items()
+            }
+        except Exception:
+            return None
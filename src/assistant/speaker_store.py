@@ -0,0 +1,92 @@
+import json
+import os
+
+import numpy as np
+
+from .voice_features import EMBEDDING_SIZE, normalize
+
+
+class SpeakerStore:
+    """Embeddings of every enrolled speaker in one float32 matrix.
+
+    The matrix is memory-mapped from `embeddings.npy` and row i belongs
+    to the i-th id in `speakers.json`, so loading is constant time and
+    scoring an utterance against everyone is a single matrix-vector
+    product.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(os.path.dirname(__file__), 'speakers')
+        self.matrix_path = os.path.join(self.directory, 'embeddings.npy')
+        self.index_path = os.path.join(self.directory, 'speakers.json')
+        self.ids = []
+        self.matrix = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                ids = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode='r')
+        except FileNotFoundError:
+            return
+        if matrix.shape != (len(ids), EMBEDDING_SIZE):
+            print("Speaker store is out of date. Please enroll your voice again.")
+            return
+        self.ids = ids
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, speaker_id):
+        return speaker_id in self.ids
+
+    def enroll(self, speaker_id, embedding):
+        """Add a speaker, or replace the embedding of one already enrolled."""
+        embedding = normalize(np.asarray(embedding, dtype=np.float32))
+        rows = np.array(self.matrix) if self.matrix is not None else \
+            np.empty((0, EMBEDDING_SIZE), dtype=np.float32)
+        ids = list(self.ids)
+
+        if speaker_id in ids:
+            rows[ids.index(speaker_id)] = embedding
+        else:
+            rows = np.vstack([rows, embedding])
+            ids.append(speaker_id)
+        self.save(ids, rows)
+
+    def remove(self, speaker_id):
+        if speaker_id not in self.ids:
+            return False
+        keep = [i for i, name in enumerate(self.ids) if name != speaker_id]
+        self.save([self.ids[i] for i in keep], np.array(self.matrix)[keep])
+        return True
+
+    def save(self, ids, rows):
+        # Release the memory map first; Windows can't replace a mapped file
+        self.matrix = None
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.matrix_path + '.tmp.npy'
+        np.save(temp_path, rows.astype(np.float32))
+        os.replace(temp_path, self.matrix_path)
+        with open(self.index_path, 'w') as f:
+            json.dump(ids, f)
+        self.load()
+
+    def identify(self, embedding):
+        """Score an embedding against every speaker.
+
+        Returns (speaker_id, score, margin), where margin is how far the
+        best cosine score is ahead of the runner-up. With a single speaker
+        enrolled there is no runner-up and the margin is the score itself,
+        so only the absolute score threshold decides.
+        """
+        if not self.ids:
+            return None, 0.0, 0.0
+        scores = self.matrix @ embedding
+        if len(scores) == 1:
+            return self.ids[0], float(scores[0]), float(scores[0])
+        top_two = np.argpartition(scores, -2)[-2:]
+        second, best = sorted(top_two, key=lambda i: scores[i])
+        return self.ids[best], float(scores[best]), float(scores[best] - scores[second])
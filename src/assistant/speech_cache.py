@@ -0,0 +1,105 @@
+import hashlib
+import os
+import wave
+from collections import OrderedDict
+
+
+class SpeechCache:
+    """Content-addressed disk cache of synthesized speech.
+
+    Entries are keyed by (text, voice id, rate) and stored as WAV files.
+    The least recently used files are evicted once the directory grows
+    past `max_bytes`, and recently played clips are also kept decoded in
+    memory so a hit can go straight to the sound card.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=64 * 1024 * 1024, memory_items=64):
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser('~'), '.voice_assistant', 'speech_cache'
+        )
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory = OrderedDict()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, text, voice_id, rate):
+        raw = f"{voice_id}\0{rate}\0{text}".encode('utf-8')
+        return hashlib.sha256(raw).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def contains(self, text, voice_id, rate):
+        key = self.key(text, voice_id, rate)
+        return key in self.memory or os.path.exists(self.path(key))
+
+    def get(self, text, voice_id, rate):
+        """Return (samples, sample_rate) for a cached phrase, or None."""
+        key = self.key(text, voice_id, rate)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            return self.memory[key]
+
+        import numpy as np
+        path = self.path(key)
+        try:
+            with wave.open(path, 'rb') as wav:
+                if wav.getsampwidth() != 2:
+                    raise wave.Error("unsupported sample width")
+                frames = wav.readframes(wav.getnframes())
+                samples = np.frombuffer(frames, dtype=np.int16)
+                if wav.getnchannels() > 1:
+                    samples = samples.reshape(-1, wav.getnchannels())
+                audio = (samples, wav.getframerate())
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (wave.Error, EOFError) as e:
+            print(f"Dropping unreadable speech cache entry: {str(e)}")
+            self.remove(path)
+            return None
+
+        self.remember(key, audio)
+        return audio
+
+    def remember(self, key, audio):
+        self.memory[key] = audio
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def render(self, engine, text, voice_id, rate):
+        """Synthesize `text` with a pyttsx3 engine and store the result."""
+        path = self.path(self.key(text, voice_id, rate))
+        temp_path = f"{path}.tmp"
+        engine.save_to_file(text, temp_path)
+        engine.runAndWait()
+        if not os.path.exists(temp_path):
+            return False
+        os.replace(temp_path, path)
+        self.evict()
+        return True
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.wav'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        key = os.path.splitext(os.path.basename(path))[0]
+        self.memory.pop(key, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,193 @@
+import itertools
+import queue
+import re
+import threading
+import time
+
+# Priorities for SpeechWorker.say(); lower values are spoken first
+URGENT = 0
+NORMAL = 1
+BACKGROUND = 2
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def split_sentences(text):
+    """Split text into sentences so the first one can be spoken right away."""
+    return [part.strip() for part in SENTENCE_BREAK.split(text) if part.strip()]
+
+
+class SentenceSegmenter:
+    """Cut streamed text into sentences as soon as each one is complete.
+
+    A sentence only counts as complete once the whitespace after its
+    full stop has arrived, so "3.14" split across two chunks stays whole.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, chunk):
+        """Add a chunk of text and return the sentences it completed."""
+        parts = SENTENCE_BREAK.split(self.buffer + chunk)
+        self.buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self):
+        """Return whatever is left once the stream has ended."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class SpeechWorker(threading.Thread):
+    """Background text-to-speech thread that owns the pyttsx3 engine.
+
+    say() only enqueues, so callers never wait for playback. Text is
+    spoken sentence by sentence from a priority queue, and interrupt()
+    cuts off the current sentence and drops everything queued before it,
+    which is what barge-in uses when the user starts talking.
+
+    With a SpeechCache, sentences that were rendered before are played
+    straight from the cache through sounddevice, and phrases passed to
+    prewarm() are rendered in the background whenever the worker is idle.
+    """
+
+    def __init__(self, rate=175, voice_hint="female", cache=None):
+        super().__init__(name="speech-worker", daemon=True)
+        self.rate = rate
+        self.voice_hint = voice_hint
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.generation = 0
+        self.cancel = threading.Event()
+        self.pending = 0
+        self.idle = threading.Condition()
+        self.engine = None
+        self.voice_id = None
+        self.cache = cache
+        self.cacheable = set()
+        # Held while a cached clip plays through sounddevice, so PortAudio
+        # isn't re-initialized underneath it
+        self.audio_lock = threading.Lock()
+
+    def init_engine(self):
+        # Imported here so the import cost is paid on this thread, not at startup
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        # Set female voice by default
+        for voice in self.engine.getProperty('voices'):
+            if self.voice_hint in voice.name.lower():
+                self.engine.setProperty('voice', voice.id)
+                break
+        # Increase speech rate for faster response
+        self.engine.setProperty('rate', self.rate)
+        self.voice_id = self.engine.getProperty('voice')
+
+    def run(self):
+        try:
+            self.init_engine()
+        except Exception as e:
+            # Keep draining the queue so callers waiting on wait() don't hang
+            print(f"Speech engine unavailable: {str(e)}")
+        while True:
+            _, _, generation, action, text = self.queue.get()
+            if action == 'render':
+                self.render(text)
+                continue
+            try:
+                if action == 'stop':
+                    return
+                if generation == self.generation:
+                    self.speak_sentence(text)
+            except Exception as e:
+                print(f"Speech error: {str(e)}")
+            finally:
+                self.done()
+
+    def speak_sentence(self, text):
+        self.cancel.clear()
+        if self.engine is None:
+            return
+        if self.cache:
+            audio = self.cache.get(text, self.voice_id, self.rate)
+            if audio is not None:
+                self.play(audio)
+                return
+            if text in self.cacheable:
+                self.enqueue(BACKGROUND, 'render', text)
+
+        self.engine.say(text)
+        # Drive the engine ourselves so playback can be stopped mid-sentence
+        self.engine.startLoop(False)
+        try:
+            while self.engine.isBusy():
+                if self.cancel.is_set():
+                    self.engine.stop()
+                    break
+                self.engine.iterate()
+                time.sleep(0.01)
+        finally:
+            self.engine.endLoop()
+
+    def play(self, audio):
+        import sounddevice as sd
+        samples, sample_rate = audio
+        with self.audio_lock:
+            sd.play(samples, sample_rate)
+            while sd.get_stream().active:
+                if self.cancel.wait(0.01):
+                    sd.stop()
+                    break
+
+    def render(self, text):
+        if self.engine is None:
+            return
+        try:
+            if not self.cache.contains(text, self.voice_id, self.rate):
+                self.cache.render(self.engine, text, self.voice_id, self.rate)
+        except Exception as e:
+            print(f"Speech cache error: {str(e)}")
+
+    def enqueue(self, priority, action, text):
+        self.queue.put((priority, next(self.counter), self.generation, action, text))
+
+    def say(self, text, priority=NORMAL):
+        sentences = split_sentences(text)
+        with self.idle:
+            self.pending += len(sentences)
+        for sentence in sentences:
+            self.enqueue(priority, 'say', sentence)
+
+    def prewarm(self, phrases):
+        """Mark phrases as cacheable and render any missing ones in the background."""
+        if not self.cache:
+            return
+        for phrase in phrases:
+            for sentence in split_sentences(phrase):
+                if sentence not in self.cacheable:
+                    self.cacheable.add(sentence)
+                    self.enqueue(BACKGROUND, 'render', sentence)
+
+    def interrupt(self):
+        """Stop the current sentence and discard everything already queued."""
+        self.generation += 1
+        self.cancel.set()
+
+    def done(self):
+        with self.idle:
+            self.pending -= 1
+            if self.pending <= 0:
+                self.idle.notify_all()
+
+    def is_speaking(self):
+        return self.pending > 0
+
+    def wait(self, timeout=None):
+        """Block until everything queued so far has been spoken or dropped."""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.pending <= 0, timeout)
+
+    def shutdown(self):
+        with self.idle:
+            self.pending += 1
+        self.queue.put((URGENT, -1, self.generation, 'stop', None))
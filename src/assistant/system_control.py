@@ -1,23 +1,26 @@
-import subprocess
-import webbrowser
 import os
-import pyautogui
-import psutil
-import random
-from datetime import datetime
-import time
-from youtubesearchpython import VideosSearch
-import urllib.parse
-import requests
-import json
-from pytube import YouTube
-from pytube import Search
 from .system_monitor import SystemMonitor
 from .health_monitor import HealthMonitor
+from .command_executor import get_executor, CommandTimeout, CommandCancelled
+from .result_cache import ResultCache
 import platform
+import re
+from commands.system_commands import CMD_COMMANDS, ALLOWED_COMMANDS
+
+WINDOW_PATTERN = re.compile(r"(\d+)\s*(second|sec|minute|min|hour)s?\b")
+WINDOW_UNITS = {'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600}
+
+
+def parse_window(command):
+    """Seconds in a phrase like "last 5 minutes", or None"""
+    match = WINDOW_PATTERN.search(command)
+    if not match:
+        return None
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
 
 class SystemController:
-    def __init__(self):
+    def __init__(self, refresh_cache=False):
         # Common websites dictionary
         self.websites = {
             'google': 'https://www.google.com',
@@ -30,57 +33,9 @@ class SystemController:
             'linkedin': 'https://www.linkedin.com'
         }
         
-        # Expand allowed CMD commands with descriptions
-        self.cmd_commands = {
-            # System information
-            'systeminfo': 'Get detailed system information',
-            'ver': 'Display Windows version',
-            'hostname': 'Show computer name',
-            'whoami': 'Show current user',
-            
-            # Network commands
-            'ipconfig': 'Show network configuration',
-            'netstat': 'Display network statistics',
-            'ping': 'Test network connection',
-            'tracert': 'Trace route to host',
-            'nslookup': 'Query DNS records',
-            
-            # System utilities
-            'tasklist': 'List running processes',
-            'taskkill': 'Terminate a process',
-            'dir': 'List directory contents',
-            'tree': 'Display folder structure',
-            'type': 'Display file contents',
-            'findstr': 'Search text in files',
-            
-            # Power management
-            'powercfg': 'Power configuration',
-            'shutdown': 'Shutdown options',
-            'logoff': 'Log off current user',
-            
-            # Network services
-            'net': 'Network commands',
-            'netsh': 'Network shell',
-            'route': 'Show/manipulate network routing',
-            
-            # System management
-            'sfc': 'System file checker',
-            'chkdsk': 'Check disk',
-            'diskpart': 'Disk partitioning',
-            'defrag': 'Defragment drives',
-            
-            # User management
-            'net user': 'User account management',
-            'net group': 'Group management',
-            
-            # File operations
-            'copy': 'Copy files',
-            'move': 'Move files',
-            'del': 'Delete files',
-            'rd': 'Remove directory',
-            'md': 'Make directory',
-            'rename': 'Rename files'
-        }
+        # Command table lives with the command registry so routing can be
+        # compiled without importing this module
+        self.cmd_commands = CMD_COMMANDS
 
         # Add search engines
         self.search_engines = {
@@ -91,8 +46,13 @@ class SystemController:
         }
 
         self.music_keywords = ['play', 'song', 'music', 'youtube']
-        self.system_monitor = SystemMonitor()
-        self.health_monitor = HealthMonitor()
+        self._system_monitor = None
+        self._health_monitor = None
+
+        # Output of slow read-only commands like systeminfo is reused until it expires
+        self.result_cache = ResultCache()
+        if refresh_cache:
+            self.result_cache.start_refresh(self.run_command)
 
         self.health_tips = [
             "Remember to maintain good posture, boss!",
@@ -105,75 +65,86 @@ class SystemController:
         self.system_info = platform.uname()
 
         # Add allowed CMD commands set
-        self.allowed_commands = {
-            'echo', 'dir', 'systeminfo', 'ipconfig', 'tasklist', 
-            'ver', 'date', 'time', 'hostname', 'whoami',
-            'type', 'path', 'ping', 'netstat', 'wmic',
-            'net', 'powercfg'
-        }
+        self.allowed_commands = ALLOWED_COMMANDS
+
+    @property
+    def system_monitor(self):
+        if self._system_monitor is None:
+            self._system_monitor = SystemMonitor()
+        return self._system_monitor
+
+    @property
+    def health_monitor(self):
+        if self._health_monitor is None:
+            self._health_monitor = HealthMonitor()
+        return self._health_monitor
+
+    def execute_basic_command(self, command, timeout=10, on_line=None):
+        """Execute basic system commands, reusing cached output where allowed"""
+        cached = self.result_cache.get(command)
+        if cached is not None:
+            return cached
+
+        result, succeeded = self.run_command(command, timeout, on_line)
+        if succeeded:
+            self.result_cache.put(command, result)
+        self.result_cache.notify_command(command)
+        return result
 
-    def execute_basic_command(self, command):
-        """Execute basic system commands"""
+    def run_command(self, command, timeout=10, on_line=None):
+        """Run a system command without consulting the cache. Returns (result, succeeded)"""
         try:
-            # Create process with proper configurations
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                shell=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace'
-            )
-            
-            # Get output with timeout
-            stdout, stderr = process.communicate(timeout=10)
+            # Runs on the shared asyncio executor; on_line sees output as it arrives
+            stdout, stderr, returncode = get_executor().run(command, timeout=timeout, on_line=on_line)
             
             # Combine output if available
             output = stdout or stderr
             if output:
-                return f"Command output:\n{output.strip()}"
-            return "Command executed successfully."
+                return f"Command output:\n{output.strip()}", returncode == 0
+            return "Command executed successfully.", returncode == 0
             
-        except subprocess.TimeoutExpired:
-            return "Command timed out after 10 seconds."
+        except CommandTimeout as e:
+            return str(e), False
+        except CommandCancelled:
+            return "Command cancelled.", False
         except Exception as e:
-            return f"Error executing command: {str(e)}"
+            return f"Error executing command: {str(e)}", False
 
-    def handle_command(self, command):
-        command = command.lower().strip()
-        
-        # Handle direct system commands first
-        base_command = command.split()[0]
-        if base_command in self.cmd_commands or base_command in self.allowed_commands:
-            return self.execute_basic_command(command)
-        
-        # Handle other commands
-        elif "open" in command:
-            return self.handle_website(command)
-        elif any(word in command for word in ["date", "time", "today"]):
-            if "time" in command:
-                return self.get_time()
-            return self.get_date()
-        elif any(word in command for word in ["status", "info", "cpu", "memory"]):
-            return self.handle_status_command(command)
-        elif command in ["help", "commands", "show commands"]:
-            return self.show_available_commands()
-    
-        return "Command not recognized. Type 'help' to see available commands."
+    def cancel_commands(self):
+        """Stop every shell command that is still running."""
+        cancelled = get_executor().cancel()
+        if cancelled:
+            return f"Cancelled {cancelled} running command{'s' if cancelled > 1 else ''}."
+        return "No command is running."
+
+    def handle_command(self, command, on_line=None):
+        # Routing is shared with TaskManager through the command registry
+        from commands.builtin import registry
+        return registry.dispatch(command.lower().strip(), on_line)
 
     def handle_status_command(self, command):
-        if "system" in command or "info" in command:
-            return self.get_system_info()
-        elif "cpu" in command:
-            return self.get_cpu_info()
+        # "cpu over the last 5 minutes" asks for a summary of the sampled
+        # history; a bare "cpu status" for the last minute
+        seconds = parse_window(command) or 60
+        if "cpu" in command:
+            return self.system_monitor.get_metric_summary('cpu', seconds)
         elif "memory" in command or "ram" in command:
-            return self.get_memory_info()
+            return self.system_monitor.get_metric_summary('memory', seconds)
         elif "disk" in command or "storage" in command:
-            return self.get_disk_info()
-        return "Status command not recognized"
+            return self.system_monitor.get_metric_summary('disk', seconds)
+        elif "network" in command:
+            if parse_window(command):
+                return (self.system_monitor.get_metric_summary('net_recv', seconds) + "\n" +
+                        self.system_monitor.get_metric_summary('net_sent', seconds))
+            return self.system_monitor.get_network_status()
+        return self.system_monitor.get_system_vitals()
+
+    def handle_process_command(self, command):
+        key = 'memory' if "memory" in command or "ram" in command else 'cpu'
+        return self.system_monitor.get_running_processes(key=key)
 
     def handle_website(self, command):
+        import webbrowser
         site_name = command.replace('open', '').strip()
         if site_name in self.websites:
             webbrowser.open_new_tab(self.websites[site_name])
@@ -1,46 +1,88 @@
-import psutil
 import os
 import platform
 from datetime import datetime
 
+from .metrics_sampler import get_sampler
+
+METRIC_LABELS = {
+    'cpu': "CPU",
+    'memory': "Memory",
+    'disk': "Disk",
+    'net_sent': "Upload",
+    'net_recv': "Download",
+}
+
 class SystemMonitor:
+    # psutil is imported inside each method so that importing the command
+    # layer stays cheap for sessions that never ask for system status.
+    # CPU, memory, disk and network figures come from the shared background
+    # sampler instead, so reading them never blocks.
+    def __init__(self):
+        self.sampler = get_sampler()
+
     def get_system_vitals(self):
-        cpu_usage = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        self.sampler.wait_ready()
+        snapshot = self.sampler.latest_snapshot()
+        if not snapshot:
+            return "System Status: no samples yet"
+        disk = snapshot['disk']
         
         return f"""System Status:
-• CPU Usage: {cpu_usage}%
-• Memory Used: {memory.percent}%
+• CPU Usage: {self.sampler.latest('cpu'):.1f}%
+• Memory Used: {snapshot['memory'].percent}%
 • Disk Space: {disk.percent}% used
 • Available Storage: {disk.free / (1024**3):.1f} GB"""
 
     def get_network_status(self):
-        network = psutil.net_io_counters()
+        self.sampler.wait_ready()
+        snapshot = self.sampler.latest_snapshot()
+        if not snapshot:
+            return "Network Status: no samples yet"
+        network = snapshot['net']
         return f"""Network Status:
+• Upload: {self.sampler.latest('net_sent')/1024:.1f} KB/s
+• Download: {self.sampler.latest('net_recv')/1024:.1f} KB/s
 • Bytes Sent: {network.bytes_sent/1024/1024:.2f} MB
 • Bytes Received: {network.bytes_recv/1024/1024:.2f} MB
 • Packets Sent: {network.packets_sent}
 • Packets Received: {network.packets_recv}"""
 
+    def get_metric_summary(self, metric, seconds=60):
+        """Min/avg/max of one sampled metric over the last `seconds` seconds"""
+        self.sampler.wait_ready()
+        stats = self.sampler.stats(metric, seconds)
+        label = METRIC_LABELS[metric]
+        if stats is None:
+            return f"No {label} samples yet"
+        unit, scale = (" KB/s", 1024) if metric.startswith('net') else ("%", 1)
+        low, avg, high = (value / scale for value in stats)
+        return (f"{label} over the last {describe_window(seconds)}: "
+                f"min {low:.1f}{unit}, avg {avg:.1f}{unit}, max {high:.1f}{unit}")
+
     def get_battery_info(self):
+        import psutil
         battery = psutil.sensors_battery()
         if battery:
             return f"Battery: {battery.percent}% {'Plugged In' if battery.power_plugged else 'Not Plugged In'}"
         return "No battery detected"
 
-    def get_running_processes(self):
-        processes = []
-        for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent']):
-            try:
-                processes.append({
-                    'name': proc.info['name'],
-                    'cpu': proc.info['cpu_percent'],
-                    'memory': proc.info['memory_percent']
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        
-        # Sort by CPU usage and get top 5
-        top_processes = sorted(processes, key=lambda x: x['cpu'], reverse=True)[:5]
-        return "\n".join([f"• {p['name']}: CPU {p['cpu']}%, RAM {p['memory']:.1f}%" for p in top_processes])
\ No newline at end of file
+    def get_running_processes(self, count=5, key='cpu'):
+        # The sampler keeps the process table up to date once asked; only
+        # the very first request waits for two passes to measure CPU
+        table = self.sampler.track_processes()
+        table.wait_ready()
+        top_processes = table.top(count, key)
+        return "\n".join([f"• {p['name']}: CPU {format_cpu(p['cpu'])}, RAM {p['memory']:.1f}%" for p in top_processes])
+
+def format_cpu(cpu):
+    # Processes seen for the first time have no CPU figure yet
+    return "n/a" if cpu is None else f"{cpu:.1f}%"
+
+def describe_window(seconds):
+    if seconds % 3600 == 0:
+        count, unit = seconds // 3600, "hour"
+    elif seconds % 60 == 0:
+        count, unit = seconds // 60, "minute"
+    else:
+        count, unit = seconds, "second"
+    return f"{count} {unit}" if count == 1 else f"{count} {unit}s"
\ No newline at end of file
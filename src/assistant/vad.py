@@ -0,0 +1,76 @@
+import numpy as np
+
+SPEECH_START = 'start'
+SPEECH_END = 'end'
+
+
+class VoiceActivityDetector:
+    """Energy-based voice activity detector with an adaptive noise floor.
+
+    Feed it one small block at a time from the audio callback. It reports
+    SPEECH_START once `onset` seconds of consecutive blocks rise above the
+    noise floor, and SPEECH_END after `hangover` seconds of quiet.
+
+    While `playback` is set (the assistant is talking through the
+    speakers) the threshold is raised by `playback_ratio` and the noise
+    floor is frozen, so the assistant's own voice picked up by the mic
+    doesn't count as speech and doesn't drag the floor up.
+    """
+
+    def __init__(self, sample_rate=16000, block_duration=0.03, threshold_ratio=3.0,
+                 min_energy=0.01, onset=0.09, hangover=0.3, playback_ratio=4.0):
+        self.threshold_ratio = threshold_ratio
+        self.min_energy = min_energy
+        self.playback_ratio = playback_ratio
+        self.playback = False
+        self.onset_blocks = max(1, round(onset / block_duration))
+        self.hangover_blocks = max(1, round(hangover / block_duration))
+        self.noise_floor = None
+        self.reset()
+
+    def reset(self):
+        """Forget the current speech state but keep the learned noise floor."""
+        self.active = False
+        self.speech_blocks = 0
+        self.silence_blocks = 0
+
+    def energy(self, samples):
+        """RMS level of an int16 block, scaled to 0..1."""
+        x = samples.astype(np.float32)
+        return float(np.sqrt(np.dot(x, x) / max(len(x), 1))) / 32768.0
+
+    def process(self, samples):
+        level = self.energy(samples)
+        if self.noise_floor is None:
+            self.noise_floor = level
+
+        threshold = max(self.noise_floor * self.threshold_ratio, self.min_energy)
+        if self.playback:
+            threshold *= self.playback_ratio
+        is_speech = level > threshold
+
+        if not self.active:
+            if not is_speech:
+                if self.playback:
+                    self.speech_blocks = 0
+                    return None
+                # Follow drops in background noise quickly, rises slowly
+                rate = 0.5 if level < self.noise_floor else 0.05
+                self.noise_floor += rate * (level - self.noise_floor)
+                self.speech_blocks = 0
+                return None
+            self.speech_blocks += 1
+            if self.speech_blocks >= self.onset_blocks:
+                self.active = True
+                self.silence_blocks = 0
+                return SPEECH_START
+            return None
+
+        if is_speech:
+            self.silence_blocks = 0
+            return None
+        self.silence_blocks += 1
+        if self.silence_blocks >= self.hangover_blocks:
+            self.reset()
+            return SPEECH_END
+        return None
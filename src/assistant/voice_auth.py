@@ -1,11 +1,37 @@
+import hashlib
 import numpy as np
 from scipy import signal
 import os
+from .speaker_store import SpeakerStore
+from .voice_features import compute_embedding
+
+# Bump when the reference features change so old cache files are rebuilt
+FEATURES_VERSION = 3
+
+# Cosine score an utterance needs to match an enrolled speaker. Measured
+# on the bundled voice sample at 16 kHz: other stretches of the same
+# recording score 0.93-0.99 against its enrollment embedding, pink and
+# brown noise at most 0.85-0.89. The embedding describes the shape of the
+# spectrum, so a similar voice (or a pitch-shifted copy) can still pass.
+SPEAKER_THRESHOLD = 0.91
+
+
+def features_path_for(signature_path):
+    """Location of the cached reference features for a signature file."""
+    return os.path.splitext(signature_path)[0] + '.features.npz'
+
 
 class VoiceAuthenticator:
-    def __init__(self, threshold=0.5):  # Lowered threshold
+    def __init__(self, threshold=0.5, speaker_threshold=SPEAKER_THRESHOLD, min_margin=0.05, store=None):  # Lowered threshold
         self.voice_signature = None
+        self.reference = None
+        # Enrolled speakers take precedence over the single legacy signature
+        self.store = store if store is not None else SpeakerStore()
+        self.speaker_threshold = speaker_threshold
+        self.min_margin = min_margin
+        self.last_speaker = None
         self.signature_path = os.path.join(os.path.dirname(__file__), 'voice_signature.npy')
+        self.features_path = features_path_for(self.signature_path)
         self.threshold = threshold
         self.load_voice_signature()
         
@@ -15,19 +41,74 @@ class VoiceAuthenticator:
             print(f"Loaded voice signature with length: {len(self.voice_signature)}")
         except FileNotFoundError:
             print("No voice signature found. Please register your voice first.")
+            return
+        self.reference = self.load_reference_features()
+
+    def spectrogram(self, data):
+        _, _, spec = signal.spectrogram(
+            data, 
+            fs=16000, 
+            nperseg=256, 
+            noverlap=128,
+            window='hann'
+        )
+        return spec
+
+    def compute_reference_features(self):
+        """Features of the stored signature that verify_voice compares against."""
+        waveform = self.voice_signature / np.max(np.abs(self.voice_signature))
+        return {
+            'waveform': waveform,
+            'spectrogram': self.spectrogram(waveform)
+        }
+
+    def load_reference_features(self):
+        """Load the reference features from disk, rebuilding them if stale."""
+        digest = hashlib.sha1(self.voice_signature.tobytes()).hexdigest()
+        try:
+            with np.load(self.features_path) as cached:
+                if int(cached['version']) == FEATURES_VERSION and str(cached['digest']) == digest:
+                    return {key: cached[key] for key in ('waveform', 'spectrogram')}
+        except (OSError, KeyError, ValueError):
+            pass
+
+        features = self.compute_reference_features()
+        try:
+            np.savez(self.features_path, version=FEATURES_VERSION, digest=digest, **features)
+        except OSError as e:
+            print(f"Could not cache voice features: {str(e)}")
+        return features
             
+    def embedding_for(self, audio, audio_data):
+        # Audio from AudioCapture carries statistics gathered while recording
+        features = getattr(audio, 'features', None)
+        embedding = features.embedding() if features is not None else None
+        return embedding if embedding is not None else compute_embedding(audio_data)
+
+    def identify_speaker(self, embedding):
+        """Match an embedding against all enrolled speakers. Returns the id or None."""
+        speaker, score, margin = self.store.identify(embedding)
+        print(f"Best speaker match: {speaker} (score: {score:.2f}, margin: {margin:.2f})")
+        if score > self.speaker_threshold and margin >= self.min_margin:
+            return speaker
+        return None
+
     def verify_voice(self, audio):
         try:
             # Convert audio to numpy array
             audio_data = np.frombuffer(audio.frame_data, dtype=np.int16)
             print(f"Input audio length: {len(audio_data)}")
             
-            if self.voice_signature is None:
+            if len(self.store):
+                self.last_speaker = self.identify_speaker(self.embedding_for(audio, audio_data))
+                return self.last_speaker is not None
+
+            if self.reference is None:
                 return True
             
             # Normalize audio data
             audio_data = audio_data / np.max(np.abs(audio_data))
-            signature = self.voice_signature / np.max(np.abs(self.voice_signature))
+            signature = self.reference['waveform']
             
             # Use multiple features for comparison
             correlations = []
@@ -41,20 +122,8 @@ class VoiceAuthenticator:
             correlations.append(time_corr)
             
             # Frequency domain correlation
-            _, _, audio_spec = signal.spectrogram(
-                audio_data, 
-                fs=16000, 
-                nperseg=256, 
-                noverlap=128,
-                window='hann'
-            )
-            _, _, sig_spec = signal.spectrogram(
-                signature, 
-                fs=16000, 
-                nperseg=256, 
-                noverlap=128,
-                window='hann'
-            )
+            audio_spec = self.spectrogram(audio_data)
+            sig_spec = self.reference['spectrogram']
             
             # Match spectrogram sizes
             min_time = min(audio_spec.shape[1], sig_spec.shape[1])
@@ -0,0 +1,80 @@
+import numpy as np
+from scipy import signal
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = 256
+FRAME_STEP = 128
+EMBEDDING_SIZE = 2 * (FRAME_SIZE // 2 + 1)
+
+
+def normalize(vector):
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def embedding_from_log_spectrum(mean, std):
+    """Turn per-bin log-power statistics into a unit-length speaker embedding."""
+    # Centering removes overall loudness so only the spectral shape is compared
+    embedding = np.concatenate([mean - mean.mean(), std - std.mean()])
+    return normalize(embedding).astype(np.float32)
+
+
+def compute_embedding(samples, sample_rate=SAMPLE_RATE):
+    """Fixed-length speaker embedding: mean and spread of the log spectrum."""
+    samples = np.asarray(samples, dtype=np.float32)
+    _, _, spec = signal.spectrogram(
+        samples,
+        fs=sample_rate,
+        nperseg=FRAME_SIZE,
+        noverlap=FRAME_SIZE - FRAME_STEP,
+        window='hann'
+    )
+    log_spec = np.log(spec + 1e-10)
+    return embedding_from_log_spectrum(log_spec.mean(axis=1), log_spec.std(axis=1))
+
+
+class StreamingSpectralStats:
+    """Running log-spectrum statistics, fed block by block during capture.
+
+    Frames, windowing and scaling match `compute_embedding`, so
+    `embedding()` gives the same result as computing it over the whole
+    utterance afterwards, but the work is spread over the audio callback
+    and the embedding is ready as soon as the utterance ends.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        self.window = signal.get_window('hann', FRAME_SIZE)
+        # Same density scaling as scipy.signal.spectrogram, one-sided
+        self.scale = np.full(FRAME_SIZE // 2 + 1, 2.0 / (sample_rate * np.sum(self.window ** 2)))
+        self.scale[0] /= 2
+        self.scale[-1] /= 2
+        self.pending = np.empty(0, dtype=np.float32)
+        self.count = 0
+        self.mean = np.zeros(FRAME_SIZE // 2 + 1)
+        self.m2 = np.zeros(FRAME_SIZE // 2 + 1)
+
+    def update(self, samples):
+        data = np.concatenate([self.pending, np.asarray(samples, dtype=np.float32)])
+        frame_count = 0 if len(data) < FRAME_SIZE else 1 + (len(data) - FRAME_SIZE) // FRAME_STEP
+        if frame_count:
+            frames = np.lib.stride_tricks.sliding_window_view(data, FRAME_SIZE)[::FRAME_STEP][:frame_count]
+            frames = frames - frames.mean(axis=1, keepdims=True)
+            power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2 * self.scale
+            self.merge(np.log(power + 1e-10))
+        self.pending = data[frame_count * FRAME_STEP:]
+
+    def merge(self, log_power):
+        # Chan et al. parallel update of the running mean and variance
+        count = len(log_power)
+        batch_mean = log_power.mean(axis=0)
+        batch_m2 = ((log_power - batch_mean) ** 2).sum(axis=0)
+        total = self.count + count
+        delta = batch_mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def embedding(self):
+        if self.count == 0:
+            return None
+        return embedding_from_log_spectrum(self.mean, np.sqrt(self.m2 / self.count))
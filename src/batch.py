@@ -0,0 +1,102 @@
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from assistant.task_manager import TaskManager
+from commands.system_commands import is_state_changing
+
+
+def parse_line(line, line_number):
+    """Accept either a JSON object with a "command" field or a plain command."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith('{'):
+        record = json.loads(line)
+        if not isinstance(record.get('command'), str):
+            raise ValueError('"command" must be a string')
+        return {'id': record.get('id', line_number), 'command': record['command']}
+    return {'id': line_number, 'command': line}
+
+
+def run_command(task_manager, record):
+    start = time.perf_counter()
+    result = {'id': record['id'], 'command': record['command']}
+    try:
+        handler, response = task_manager.dispatch(record['command'])
+        result.update(handler=handler, response=response)
+    except Exception as e:
+        result.update(handler=None, response=None, error=str(e))
+    result['latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def run_batch(task_manager, lines, output, workers=8):
+    """Dispatch commands on a worker pool and write one JSONL record per command.
+
+    Results are written in input order. Commands that change the machine's
+    state act as barriers: everything before them finishes first, and they
+    run on their own.
+    """
+    pending = deque()
+    count = 0
+
+    def write_ready(block=False):
+        while pending and (block or pending[0].done()):
+            output.write(json.dumps(pending.popleft().result()) + "\n")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line_number, line in enumerate(lines, 1):
+            try:
+                record = parse_line(line, line_number)
+            except (ValueError, KeyError) as e:
+                write_ready(block=True)
+                output.write(json.dumps({'id': line_number, 'error': f"Invalid input: {str(e)}"}) + "\n")
+                continue
+            if record is None:
+                continue
+            count += 1
+
+            name, _ = task_manager.route(record['command'])
+            if name == "system" and is_state_changing(record['command']):
+                write_ready(block=True)
+                output.write(json.dumps(run_command(task_manager, record)) + "\n")
+                continue
+
+            pending.append(executor.submit(run_command, task_manager, record))
+            # Keep a bounded number of results in flight
+            if len(pending) >= workers * 4:
+                pending[0].result()
+            write_ready()
+        write_ready(block=True)
+    output.flush()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run assistant commands from a file without voice or TTS")
+    parser.add_argument("input", nargs="?", default="-", help="commands file, one per line (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="number of commands run in parallel")
+    args = parser.parse_args()
+
+    task_manager = TaskManager()
+    source = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    sink = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    try:
+        count = run_batch(task_manager, source, sink, args.workers)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} commands in {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from assistant.llm_client import LLMClient, TokenBucket
+from benchmark_streaming import FakeResponse
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeTransport:
+    """Local stand-in for a quota-limited genai.GenerativeModel.
+
+    Accepts `quota` requests per second (anything over that fails with
+    429), takes `latency` seconds per request plus up to `jitter` more,
+    and fails a fraction `error_rate` of requests with a 503.
+    """
+
+    def __init__(self, quota=5.0, latency=0.1, jitter=0.05, error_rate=0.02, seed=0):
+        self.quota = TokenBucket(quota, quota)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.received = 0
+        self.rejected = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.received += 1
+        if self.quota.take():
+            self.rejected += 1
+            raise FakeAPIError(429, "Resource has been exhausted (e.g. check quota).")
+        await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+        if self.random.random() < self.error_rate:
+            raise FakeAPIError(503, "The service is currently unavailable.")
+        return FakeResponse([f"Reply to: {prompt}"], 0)
+
+
+async def burst(transport, prompts, client=None):
+    """Send every prompt at once. Returns (latencies of successes, failure count)."""
+    async def one(prompt):
+        start = time.perf_counter()
+        try:
+            if client is None:
+                await transport.generate_content_async(prompt)
+            else:
+                await client.call(lambda: transport.generate_content_async(prompt), key=prompt)
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    results = await asyncio.gather(*(one(prompt) for prompt in prompts))
+    latencies = [r for r in results if r is not None]
+    return latencies, len(results) - len(latencies)
+
+
+def report(label, prompts, latencies, failures, elapsed, transport):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(f"{label}: {len(latencies)}/{len(prompts)} succeeded in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.1f}/s), {failures} failed")
+    if latencies:
+        print(f"  latency p50 {statistics.median(latencies) * 1000:.0f} ms, "
+              f"p95 {p95 * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+    print(f"  backend saw {transport.received} requests, rejected {transport.rejected} with 429")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM calls under a burst against a local fake API")
+    parser.add_argument("--requests", type=int, default=60, help="requests in the burst")
+    parser.add_argument("--distinct", type=int, default=40, help="distinct prompts among them")
+    parser.add_argument("--quota", type=float, default=5.0, help="requests per second the fake API accepts")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    prompts = [f"question {rng.randrange(args.distinct)}" for _ in range(args.requests)]
+
+    transport = FakeTransport(quota=args.quota)
+    start = time.perf_counter()
+    latencies, failures = asyncio.run(burst(transport, prompts))
+    report("Direct", prompts, latencies, failures, time.perf_counter() - start, transport)
+
+    transport = FakeTransport(quota=args.quota)
+    client = LLMClient(max_concurrent=4, rate=args.quota * 0.9, burst=int(args.quota))
+    start = time.perf_counter()
+    latencies, failures = asyncio.run(burst(transport, prompts, client))
+    report("Client", prompts, latencies, failures, time.perf_counter() - start, transport)
+    print(f"  {client.stats()}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
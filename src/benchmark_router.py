@@ -0,0 +1,54 @@
+import argparse
+import random
+import sys
+import time
+
+from assistant.task_manager import TaskManager
+
+SAMPLE_COMMANDS = [
+    "what time is it",
+    "what's the date today",
+    "how are you doing today",
+    "hello there",
+    "thank you so much",
+    "open youtube",
+    "show me the cpu status",
+    "system info please",
+    "ipconfig /all",
+    "ping google.com",
+    "help",
+    "tell me something interesting about the information age",
+    "i love you",
+    "net user administrator",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure intent routing throughput")
+    parser.add_argument("--commands", type=int, default=100000, help="number of commands to route")
+    parser.add_argument("--min-rate", type=float, default=20000.0,
+                        help="fail if fewer commands per second are routed")
+    args = parser.parse_args()
+
+    task_manager = TaskManager()
+    rng = random.Random(0)
+    commands = [rng.choice(SAMPLE_COMMANDS) for _ in range(args.commands)]
+
+    # Only routing is timed; handlers would run shell commands and open browsers
+    route = task_manager.route
+    start = time.perf_counter()
+    for command in commands:
+        route(command)
+    elapsed = time.perf_counter() - start
+
+    rate = len(commands) / elapsed
+    print(f"Routed {len(commands)} commands in {elapsed * 1000:.1f} ms "
+          f"({rate:,.0f} commands/s, {elapsed / len(commands) * 1e6:.2f} us each)")
+    if rate < args.min_rate:
+        print(f"FAIL: below the {args.min_rate:,.0f} commands/s target")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
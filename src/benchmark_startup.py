@@ -0,0 +1,86 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Builds the assistant the way a text-mode session does, without running it
+STARTUP_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "from main import VoiceAssistant; VoiceAssistant(); "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def run_python(args):
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True
+    )
+
+
+def measure_cold_start(runs):
+    """Time fresh interpreters importing and constructing the assistant.
+
+    Returns (process_ms, assistant_ms) lists: the wall time of the whole
+    process and the part spent in our own imports and constructor.
+    """
+    process_ms, assistant_ms = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = run_python(["-c", STARTUP_SNIPPET])
+        process_ms.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"Startup failed:\n{result.stderr}")
+        # The last line is our timing; anything before it is assistant output
+        assistant_ms.append(float(result.stdout.strip().splitlines()[-1]))
+    return process_ms, assistant_ms
+
+
+def import_breakdown(top):
+    """Parse `-X importtime` output and return the slowest top-level imports."""
+    result = run_python(["-X", "importtime", "-c", "import main"])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented two spaces per level; skip the deep ones
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure assistant cold-start time")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time")
+    parser.add_argument("--budget-ms", type=float, default=500.0,
+                        help="fail if the median cold-start wall time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="number of imports to list")
+    args = parser.parse_args()
+
+    process_ms, assistant_ms = measure_cold_start(args.runs)
+    median = statistics.median(process_ms)
+
+    print("Slowest imports (cumulative ms, self ms, module):")
+    for cumulative_us, self_us, name in import_breakdown(args.top):
+        print(f"  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name}")
+
+    print(f"\nCold start over {args.runs} runs: median {median:.1f} ms, "
+          f"min {min(process_ms):.1f} ms, max {max(process_ms):.1f} ms")
+    print(f"Assistant imports and constructor: median {statistics.median(assistant_ms):.1f} ms")
+    if median > args.budget_ms:
+        print(f"FAIL: median startup exceeds the {args.budget_ms:.0f} ms budget")
+        return 1
+    print(f"OK: within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
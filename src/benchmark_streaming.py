@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from assistant.llm_stream import speak_stream, stream_text
+from assistant.speech_worker import split_sentences
+
+SAMPLE_REPLY = (
+    "The Geminids are a meteor shower that peaks every December. "
+    "Unlike most showers, they come from an asteroid, 3200 Phaethon, rather than a comet. "
+    "Under dark skies you can see more than a hundred meteors an hour at the peak. "
+    "They are often bright and slow, and many of them look yellowish. "
+    "The best time to watch is after midnight, when the radiant in Gemini is high. "
+    "No telescope is needed; just give your eyes twenty minutes to adjust to the dark."
+)
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeResponse:
+    """Async-iterable like a streamed genai response; `text` once it has all arrived."""
+
+    def __init__(self, chunks, delay):
+        self.chunks = chunks
+        self.delay = delay
+        self.text = "".join(chunks)
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield FakeChunk(chunk)
+
+
+class FakeStreamingModel:
+    """Local stand-in for genai.GenerativeModel that streams a canned reply.
+
+    The reply is cut into `chunk_size` character chunks, one every `delay`
+    seconds. Without stream=True the call returns only once every chunk
+    would have been generated, like the real API.
+    """
+
+    def __init__(self, reply, chunk_size=16, delay=0.05):
+        self.chunks = [reply[i:i + chunk_size] for i in range(0, len(reply), chunk_size)]
+        self.delay = delay
+
+    async def generate_content_async(self, prompt, stream=False):
+        response = FakeResponse(self.chunks, self.delay)
+        if not stream:
+            await asyncio.sleep(self.delay * len(self.chunks))
+        return response
+
+
+async def first_sentence_full(model, prompt):
+    """Seconds until the first sentence could be spoken without streaming."""
+    start = time.perf_counter()
+    response = await model.generate_content_async(prompt)
+    split_sentences(response.text)
+    return time.perf_counter() - start, time.perf_counter() - start
+
+
+async def first_sentence_streamed(model, prompt):
+    """Seconds until the first sentence reaches `say` with streaming, and in total."""
+    start = time.perf_counter()
+    first = []
+
+    def say(sentence):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    response = await model.generate_content_async(prompt, stream=True)
+    await speak_stream(stream_text(response), say)
+    return first[0], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare time to first spoken sentence with and without streaming")
+    parser.add_argument("--chunk-size", type=int, default=16, help="characters per streamed chunk")
+    parser.add_argument("--delay", type=float, default=0.02, help="seconds between chunks")
+    args = parser.parse_args()
+
+    # Only the text side is timed, against a local fake model; no TTS or network
+    model = FakeStreamingModel(SAMPLE_REPLY, args.chunk_size, args.delay)
+    full_first, full_total = asyncio.run(first_sentence_full(model, "geminids"))
+    stream_first, stream_total = asyncio.run(first_sentence_streamed(model, "geminids"))
+
+    print(f"Without streaming: first sentence after {full_first * 1000:.0f} ms (total {full_total * 1000:.0f} ms)")
+    print(f"With streaming:    first sentence after {stream_first * 1000:.0f} ms (total {stream_total * 1000:.0f} ms)")
+    if stream_first >= full_first:
+        print("FAIL: streaming did not reach the first sentence sooner")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import random
+
+from assistant.intent_router import KEYWORD, FIRST, EXACT
+from .command_handler import CommandRegistry
+from .system_commands import CMD_COMMANDS, ALLOWED_COMMANDS
+
+registry = CommandRegistry()
+
+TASK_MANAGER = "assistant.task_manager:TaskManager"
+SYSTEM_CONTROLLER = "assistant.system_control:SystemController"
+
+CHAT_RESPONSES = {
+    "hello": ["Hello boss!", "Hi there!", "Hey boss!"],
+    "how are you": ["I'm doing great boss!", "All systems operational!"],
+    "thank you": ["You're welcome boss!", "Anytime!"],
+    "i like you": ["i am happy that you liked me!", "Thanks!", "I appreciate it!"],
+    "i love you": ["I love you too, boss!", "You're the best!"],
+    "default": ["I don't understand that command, boss.", 
+              "Could you try that again?"]
+}
+
+# "time" and "date" are answered directly rather than run in a shell
+SYSTEM_TRIGGERS = sorted((set(CMD_COMMANDS) | ALLOWED_COMMANDS) - {"time", "date"})
+
+
+@registry.command("help", ["help", "commands", "show commands"], EXACT, 100, SYSTEM_CONTROLLER)
+def show_help(controller, command, phrase):
+    return controller.show_available_commands()
+
+
+@registry.command("system", SYSTEM_TRIGGERS, FIRST, 90, SYSTEM_CONTROLLER, streams=True)
+def run_system_command(controller, command, phrase, on_line=None):
+    return controller.execute_basic_command(command, on_line=on_line)
+
+
+@registry.command("cancel", ["cancel", "cancel command", "stop command"], EXACT, 100, SYSTEM_CONTROLLER)
+def cancel_commands(controller, command, phrase):
+    return controller.cancel_commands()
+
+
+@registry.command("website", ["open"], KEYWORD, 80, SYSTEM_CONTROLLER)
+def open_website(controller, command, phrase):
+    return controller.handle_website(command)
+
+
+@registry.command("time", ["time", "clock"], KEYWORD, 70, TASK_MANAGER)
+def tell_time(task_manager, command, phrase):
+    return task_manager.get_time()
+
+
+@registry.command("chat", [key for key in CHAT_RESPONSES if key != "default"], KEYWORD, 65, TASK_MANAGER)
+def chat(task_manager, command, phrase):
+    return random.choice(task_manager.chat_responses[phrase])
+
+
+@registry.command("date", ["date", "today", "day"], KEYWORD, 60, TASK_MANAGER)
+def tell_date(task_manager, command, phrase):
+    return task_manager.get_date()
+
+
+@registry.command("processes", ["processes", "top processes", "using my cpu", "using the cpu",
+                                 "using my memory", "using my ram"], KEYWORD, 55, SYSTEM_CONTROLLER)
+def top_processes(controller, command, phrase):
+    return controller.handle_process_command(command)
+
+
+@registry.command("status", ["status", "info", "cpu", "memory", "ram", "disk", "storage", "network"], KEYWORD, 50, SYSTEM_CONTROLLER)
+def system_status(controller, command, phrase):
+    return controller.handle_status_command(command)
+
+
+@registry.command("default", default=True, target=TASK_MANAGER)
+def fallback(task_manager, command, phrase):
+    return random.choice(task_manager.chat_responses["default"])
@@ -1,22 +1,104 @@
-voice-assistant
-├── src
-│   ├── main.py
-│   ├── assistant
-│   │   ├── __init__.py
-│   │   ├── speech_recognition.py
-│   │   ├── voice_auth.py
-│   │   ├── task_manager.py
-│   │   └── system_control.py
-│   ├── commands
-│   │   ├── __init__.py
-│   │   └── command_handler.py
-│   └── utils
-│       ├── __init__.py
-│       └── audio_utils.py
-├── tests
-│   ├── __init__.py
-│   ├── test_speech_recognition.py
-│   └── test_voice_auth.py
-├── requirements.txt
-├── config.yaml
-└── README.md
\ No newline at end of file
+import importlib
+import threading
+
+from assistant.intent_router import IntentRouter, KEYWORD
+
+
+class CommandRegistry:
+    """Registry of command handlers, declared with the `command` decorator.
+
+    Each handler names its trigger phrases and the "module:Class" it
+    works on. Triggers are compiled into an IntentRouter, but the target
+    module is only imported, and its class only instantiated, the first
+    time one of its commands is matched.
+    Handlers are called as ``handler(target, command, phrase)``; those
+    declared with ``streams=True`` also get an ``on_line`` callback for
+    output that arrives while they run.
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.targets = {}
+        self.building = set()
+        self.default_name = None
+        self.router = None
+        self.lock = threading.Lock()
+        self.built = threading.Condition(self.lock)
+
+    def command(self, name, triggers=(), mode=KEYWORD, priority=50, target=None, default=False, streams=False):
+        def decorator(handler):
+            self.commands[name] = {
+                'handler': handler,
+                'triggers': list(triggers),
+                'mode': mode,
+                'priority': priority,
+                'target': target,
+                'streams': streams,
+            }
+            if default:
+                self.default_name = name
+            # Routing has to be recompiled to pick up the new command
+            self.router = None
+            return handler
+        return decorator
+
+    def provide(self, target, instance):
+        """Use an existing object for `target` instead of constructing one."""
+        with self.lock:
+            # A target that load() is constructing right now registers
+            # itself from its own __init__; load() stores it when done
+            if target not in self.building:
+                self.targets[target] = instance
+
+    def load(self, target):
+        """Import and instantiate a handler target on first use."""
+        with self.lock:
+            while target in self.building:
+                self.built.wait()
+            if target in self.targets:
+                return self.targets[target]
+            self.building.add(target)
+
+        # Constructed outside the lock: constructors may call provide() or
+        # load() other targets themselves
+        try:
+            module_name, _, attr = target.partition(':')
+            obj = importlib.import_module(module_name)
+            for part in attr.split('.'):
+                obj = getattr(obj, part)
+            instance = obj() if isinstance(obj, type) else obj
+        except BaseException:
+            with self.lock:
+                self.building.discard(target)
+                self.built.notify_all()
+            raise
+
+        with self.lock:
+            self.building.discard(target)
+            self.targets[target] = instance
+            self.built.notify_all()
+        return instance
+
+    def rules(self):
+        return [
+            (name, entry['priority'], entry['mode'], entry['triggers'])
+            for name, entry in self.commands.items()
+            if entry['triggers']
+        ]
+
+    def resolve(self, command):
+        """Return (command name, matched phrase) for a command string."""
+        if self.router is None:
+            self.router = IntentRouter(self.rules(), default=self.default_name)
+        return self.router.route(command)
+
+    def call(self, name, command, phrase=None, on_line=None):
+        entry = self.commands[name]
+        target = self.load(entry['target']) if entry['target'] else None
+        if entry['streams'] and on_line is not None:
+            return entry['handler'](target, command, phrase, on_line=on_line)
+        return entry['handler'](target, command, phrase)
+
+    def dispatch(self, command, on_line=None):
+        name, phrase = self.resolve(command)
+        return self.call(name, command, phrase, on_line)
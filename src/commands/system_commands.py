@@ -0,0 +1,91 @@
+# Shell commands the assistant is allowed to run, with their descriptions
+CMD_COMMANDS = {
+    # System information
+    'systeminfo': 'Get detailed system information',
+    'ver': 'Display Windows version',
+    'hostname': 'Show computer name',
+    'whoami': 'Show current user',
+    
+    # Network commands
+    'ipconfig': 'Show network configuration',
+    'netstat': 'Display network statistics',
+    'ping': 'Test network connection',
+    'tracert': 'Trace route to host',
+    'nslookup': 'Query DNS records',
+    
+    # System utilities
+    'tasklist': 'List running processes',
+    'taskkill': 'Terminate a process',
+    'dir': 'List directory contents',
+    'tree': 'Display folder structure',
+    'type': 'Display file contents',
+    'findstr': 'Search text in files',
+    
+    # Power management
+    'powercfg': 'Power configuration',
+    'shutdown': 'Shutdown options',
+    'logoff': 'Log off current user',
+    
+    # Network services
+    'net': 'Network commands',
+    'netsh': 'Network shell',
+    'route': 'Show/manipulate network routing',
+    
+    # System management
+    'sfc': 'System file checker',
+    'chkdsk': 'Check disk',
+    'diskpart': 'Disk partitioning',
+    'defrag': 'Defragment drives',
+    
+    # User management
+    'net user': 'User account management',
+    'net group': 'Group management',
+    
+    # File operations
+    'copy': 'Copy files',
+    'move': 'Move files',
+    'del': 'Delete files',
+    'rd': 'Remove directory',
+    'md': 'Make directory',
+    'rename': 'Rename files'
+}
+
+# Extra commands that may run without being listed in help
+ALLOWED_COMMANDS = {
+    'echo', 'dir', 'systeminfo', 'ipconfig', 'tasklist', 
+    'ver', 'date', 'time', 'hostname', 'whoami',
+    'type', 'path', 'ping', 'netstat', 'wmic',
+    'net', 'powercfg'
+}
+
+
+# Commands that change the state of the machine. These are never run
+# alongside other commands in batch mode and must never be cached.
+STATE_CHANGING_COMMANDS = {
+    'taskkill', 'shutdown', 'logoff', 'del', 'copy', 'move', 'rd', 'md',
+    'rename', 'diskpart', 'defrag', 'sfc', 'chkdsk', 'powercfg', 'net',
+    'netsh', 'route', 'wmic'
+}
+
+
+def is_state_changing(command):
+    words = command.lower().split()
+    return bool(words) and words[0] in STATE_CHANGING_COMMANDS
+
+
+# Result caching for read-only commands whose output rarely changes.
+# 'ttl' is in seconds; 'events' lists what makes a cached answer stale.
+# Commands not listed here, and any state-changing command, are never cached.
+CACHE_POLICY = {
+    'systeminfo': {'ttl': 3600, 'events': ('network',)},
+    'hostname': {'ttl': 86400, 'events': ()},
+    'ver': {'ttl': 86400, 'events': ()},
+    'whoami': {'ttl': 86400, 'events': ()},
+    'ipconfig': {'ttl': 300, 'events': ('network',)},
+}
+
+# Events raised by running a state-changing command
+COMMAND_EVENTS = {
+    'netsh': ('network',),
+    'route': ('network',),
+}
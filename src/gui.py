@@ -1,16 +1,111 @@
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                           QPushButton, QTextEdit, QLabel, QComboBox)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
+                           QPushButton, QTextEdit, QLabel, QComboBox, QListView)
+from PyQt6.QtCore import Qt, QThread, QObject, QRunnable, QThreadPool, pyqtSignal, QTimer
 from PyQt6.QtGui import QFont, QColor, QPalette, QIcon
 import sys
 import os
+import threading
+import time
 from main import VoiceAssistant
+from transcript import TranscriptModel
+from assistant.command_output import OutputStreamer
+
+# Set SAVE_TRANSCRIPTS to keep the full text of each session in
+# TRANSCRIPT_DIR (newest few sessions only); otherwise long output is cut
+SAVE_TRANSCRIPTS = False
+TRANSCRIPT_DIR = os.path.join(os.path.expanduser("~"), ".voice_assistant", "transcripts")
+
+
+class JobSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class Job(QRunnable):
+    """One blocking call run on the thread pool."""
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        # QRunnable can't emit signals itself
+        self.signals = JobSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+class WorkerBridge(QObject):
+    """Run assistant work off the Qt event loop.
+
+    Blocking calls go to a QThreadPool and their results come back to
+    the UI thread as signals. Status text is coalesced: however often it
+    is posted, the label is updated at most once per `status_interval`
+    milliseconds with the newest text.
+    """
+
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, max_threads=4, status_interval=100, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        # Jobs are kept here until they finish so their signals outlive run()
+        self.jobs = set()
+        self.pending_status = None
+        self.status_timer = QTimer(self)
+        self.status_timer.setSingleShot(True)
+        self.status_timer.setInterval(status_interval)
+        self.status_timer.timeout.connect(self.flush_status)
+
+    def submit(self, fn, *args, on_result=None, on_error=None):
+        job = Job(fn, *args)
+        # Connected first so busy() is already up to date in the callbacks
+        job.signals.finished.connect(lambda _: self.jobs.discard(job))
+        job.signals.failed.connect(lambda _: self.jobs.discard(job))
+        if on_result:
+            job.signals.finished.connect(on_result)
+        if on_error:
+            job.signals.failed.connect(on_error)
+        self.jobs.add(job)
+        self.pool.start(job)
+        return job
+
+    def busy(self):
+        return len(self.jobs)
+
+    def post_status(self, text):
+        self.pending_status = text
+        if not self.status_timer.isActive():
+            self.status_timer.start()
+
+    def flush_status(self):
+        text, self.pending_status = self.pending_status, None
+        if text is not None:
+            self.status_changed.emit(text)
+
+    def shutdown(self, timeout=2000):
+        self.pool.clear()
+        self.pool.waitForDone(timeout)
+
 
 class AssistantGUI(QMainWindow):
+    # Shell output lines, emitted from the command executor's thread
+    output_line = pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.assistant = VoiceAssistant()
+        self.voice_thread = None
+        self.bridge = WorkerBridge(parent=self)
         self.initUI()
+        self.bridge.status_changed.connect(self.status_label.setText)
+        self.output_line.connect(self.log_output)
         
     def initUI(self):
         self.setWindowTitle('S.U.N.N.Y - AI Assistant')
@@ -34,7 +129,7 @@ class AssistantGUI(QMainWindow):
                 color: #ffffff;
                 font-size: 16px;
             }
-            QTextEdit {
+            QTextEdit, QListView {
                 background-color: #2d2d2d;
                 color: #00ff00;
                 border: 1px solid #0077ff;
@@ -62,10 +157,14 @@ class AssistantGUI(QMainWindow):
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.status_label)
         
-        # Add output display
-        self.output_display = QTextEdit()
-        self.output_display.setReadOnly(True)
+        # Add output display. The list view only lays out the rows on
+        # screen, and the model keeps a capped number of them
+        self.transcript = TranscriptModel(spill_dir=TRANSCRIPT_DIR if SAVE_TRANSCRIPTS else None, parent=self)
+        self.output_display = QListView()
+        self.output_display.setModel(self.transcript)
+        self.output_display.setWordWrap(True)
         self.output_display.setMinimumHeight(300)
+        self.output_display.doubleClicked.connect(self.transcript.toggle)
         layout.addWidget(self.output_display)
         
         # Add input mode selector
@@ -93,6 +192,16 @@ class AssistantGUI(QMainWindow):
         self.send_button = QPushButton('Send Command')
         self.send_button.clicked.connect(self.send_command)
         button_layout.addWidget(self.send_button)
+
+        self.restart_voice_button = QPushButton('Restart Voice Input')
+        self.restart_voice_button.clicked.connect(self.restart_voice_mode)
+        self.restart_voice_button.setEnabled(False)
+        button_layout.addWidget(self.restart_voice_button)
+
+        self.stop_voice_button = QPushButton('Stop Voice Mode')
+        self.stop_voice_button.clicked.connect(self.stop_voice_mode)
+        self.stop_voice_button.setEnabled(False)
+        button_layout.addWidget(self.stop_voice_button)
         
         layout.addLayout(button_layout)
         
@@ -105,6 +214,15 @@ class AssistantGUI(QMainWindow):
         self.status_timer.timeout.connect(self.update_status)
         self.status_timer.start(1000)  # Update every second
 
+    def closeEvent(self, event):
+        if self.voice_thread:
+            self.voice_thread.stop()
+            self.voice_thread.wait(2000)
+        self.bridge.shutdown()
+        self.assistant.speech.shutdown()
+        self.transcript.close()
+        super().closeEvent(event)
+
     def center_window(self):
         screen = QApplication.primaryScreen().geometry()
         size = self.geometry()
@@ -113,16 +231,27 @@ class AssistantGUI(QMainWindow):
         self.move(x, y)
 
     def update_status(self):
-        # Add dynamic status updates
-        import psutil
-        cpu = psutil.cpu_percent()
-        memory = psutil.virtual_memory().percent
-        self.status_label.setText(
-            f'S.U.N.N.Y Status: Ready | CPU: {cpu}% | RAM: {memory}%'
+        # Read the background sampler's latest values; never call psutil
+        # on the UI thread. Imported here so numpy isn't loaded at startup
+        from assistant.metrics_sampler import get_sampler
+        sampler = get_sampler()
+        cpu = sampler.latest('cpu')
+        memory = sampler.latest('memory')
+        state = 'Working' if self.bridge.busy() else 'Ready'
+        if cpu is None:
+            self.bridge.post_status(f'S.U.N.N.Y Status: {state}')
+            return
+        self.bridge.post_status(
+            f'S.U.N.N.Y Status: {state} | CPU: {cpu:.0f}% | RAM: {memory:.0f}%'
         )
 
     def log_output(self, text):
-        self.output_display.append(f"S.U.N.N.Y: {text}")
+        # Only follow new output if the user hasn't scrolled back
+        scrollbar = self.output_display.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.transcript.append(f"S.U.N.N.Y: {text}")
+        if at_bottom:
+            self.output_display.scrollToBottom()
 
     def start_assistant(self):
         mode = self.mode_selector.currentText()
@@ -138,24 +267,59 @@ class AssistantGUI(QMainWindow):
         self.log_output("Voice authentication setup complete!")
 
     def send_command(self):
-        command = self.input_field.toPlainText().strip()
+        command = self.input_field.toPlainText().strip().lower()
         if command:
             self.log_output(f"Command: {command}")
-            response = self.assistant.get_chat_response(command)
-            self.assistant.speak(response)
-            self.log_output(f"Response: {response}")
             self.input_field.clear()
+            # Dispatch can run shell commands or wait on the network, so it
+            # runs on the pool; the reply comes back as a signal. The first
+            # lines of shell output are shown and read out as they arrive
+            streamer = OutputStreamer(print_line=self.output_line.emit, say=self.assistant.speech.say, max_printed=5)
+            self.bridge.submit(
+                lambda: streamer.finish(self.assistant.handle_command(command, on_line=streamer)),
+                on_result=self.handle_command_result,
+                on_error=lambda e: self.handle_command_result(f"Error: {e}")
+            )
+            self.update_status()
+
+    def handle_command_result(self, response):
+        if response:
+            self.log_output(f"Response: {response}")
+            # Queued to the speech worker; doesn't block
+            self.assistant.speak(response)
+        self.update_status()
 
     def start_voice_mode(self):
         self.input_field.setEnabled(False)
         self.send_button.setEnabled(False)
         self.log_output("Voice mode activated. Listening...")
         # Start voice recognition in a separate thread
+        if self.voice_thread and self.voice_thread.isRunning():
+            return
         self.voice_thread = VoiceThread(self.assistant)
         self.voice_thread.response_signal.connect(self.handle_voice_response)
+        self.voice_thread.state_signal.connect(self.log_output)
+        self.voice_thread.finished.connect(self.voice_mode_finished)
+        self.restart_voice_button.setEnabled(True)
+        self.stop_voice_button.setEnabled(True)
         self.voice_thread.start()
 
+    def stop_voice_mode(self):
+        if self.voice_thread:
+            self.voice_thread.stop()
+
+    def restart_voice_mode(self):
+        if self.voice_thread and self.voice_thread.isRunning():
+            self.voice_thread.restart()
+
+    def voice_mode_finished(self):
+        self.restart_voice_button.setEnabled(False)
+        self.stop_voice_button.setEnabled(False)
+        self.input_field.setEnabled(True)
+        self.send_button.setEnabled(True)
+
     def start_text_mode(self):
+        self.stop_voice_mode()
         self.input_field.setEnabled(True)
         self.send_button.setEnabled(True)
         self.log_output("Text mode activated. Type your commands.")
@@ -164,24 +328,159 @@ class AssistantGUI(QMainWindow):
         self.log_output(response)
 
 class VoiceThread(QThread):
+    """Supervised voice pipeline.
+
+    The pipeline is rebuilt whenever it fails: the microphone can't be
+    opened, the input stream dies (device unplugged) or errors keep
+    coming. Each failed attempt waits twice as long as the previous one,
+    up to `max_backoff` seconds, and the wait is reset once the pipeline
+    has run cleanly for `healthy_after` seconds. Before retrying after a
+    failure PortAudio is re-initialized, so a microphone that was plugged
+    back in shows up again; while a reply is still playing that waits for
+    the next retry. Errors reach the UI at most once per
+    `error_interval` seconds. restart() rebuilds the pipeline right away
+    without counting as a failure.
+    """
+
     response_signal = pyqtSignal(str)
-    
+    state_signal = pyqtSignal(str)
+
+    base_backoff = 1.0
+    max_backoff = 30.0
+    healthy_after = 30.0
+    error_interval = 5.0
+    max_errors = 5  # Errors within error_interval that force a restart
+
     def __init__(self, assistant):
         super().__init__()
         self.assistant = assistant
-        
+        self.authenticator = None  # Built on the voice thread by run_pipeline()
+        self.pipeline = None
+        self.stop_requested = threading.Event()
+        self.restart_requested = threading.Event()  # Too many errors
+        self.manual_restart = threading.Event()
+        self.error_lock = threading.Lock()
+        self.last_error_time = 0.0
+        self.suppressed_errors = 0
+        self.recent_errors = []
+
     def run(self):
-        while True:
+        failures = 0
+        while not self.stop_requested.is_set():
+            self.restart_requested.clear()
+            if failures and not self.reset_audio_devices():
+                print("Debug - Audio still playing; device rescan postponed")
+            started = time.monotonic()
+            finished = False
+            try:
+                finished = self.run_pipeline()
+            except Exception as e:
+                self.report_error(e)
+
+            if finished or self.stop_requested.is_set():
+                break
+            if self.manual_restart.is_set():
+                self.manual_restart.clear()
+                failures = 0
+                self.state_signal.emit("Restarting voice input...")
+                continue
+            if time.monotonic() - started >= self.healthy_after:
+                failures = 0
+            failures += 1
+            delay = min(self.base_backoff * 2 ** (failures - 1), self.max_backoff)
+            self.state_signal.emit(f"Voice input unavailable, retrying in {delay:.0f} s")
+            # A manual restart cuts the wait short
+            deadline = time.monotonic() + delay
+            while (not self.stop_requested.wait(0.2) and not self.manual_restart.is_set()
+                   and time.monotonic() < deadline):
+                pass
+            if self.manual_restart.is_set():
+                self.manual_restart.clear()
+                failures = 0
+        self.state_signal.emit("Voice mode stopped")
+
+    def run_pipeline(self):
+        """Run one pipeline until it ends. Returns True if it ended on "goodbye"."""
+        if self.authenticator is None:
+            # Imported and built here so scipy and a rebuild of the
+            # reference features never hold up the UI thread
+            from assistant.voice_auth import VoiceAuthenticator
+            self.authenticator = VoiceAuthenticator()
+        capture = self.assistant.capture
+        self.assistant.configure_capture()
+        capture.open()
+        self.pipeline = self.assistant.create_pipeline(
+            verify=self.authenticator.verify_voice,
+            on_response=self.response_signal.emit,
+            on_error=self.report_error
+        )
+        self.pipeline.start()
+        self.state_signal.emit("Listening...")
+        try:
+            while not self.pipeline.wait(0.5):
+                if (self.stop_requested.is_set() or self.restart_requested.is_set()
+                        or self.manual_restart.is_set()):
+                    return False
+                if not capture.is_active():
+                    raise RuntimeError("Audio input stream stopped")
+            return True
+        finally:
+            self.pipeline.stop()
             try:
-                audio = self.assistant.recognizer.listen()
-                if self.assistant.authenticator.verify_voice(audio):
-                    command = self.assistant.recognizer.recognize(audio)
-                    if command:
-                        response = self.assistant.get_chat_response(command)
-                        self.assistant.speak(response)
-                        self.response_signal.emit(response)
+                capture.close()
             except Exception as e:
-                self.response_signal.emit(f"Error: {str(e)}")
+                print(f"Error closing audio input: {str(e)}")
+            self.pipeline.join()
+
+    def reset_audio_devices(self):
+        """Re-initialize PortAudio. Returns False if playback kept it busy."""
+        # PortAudio reads the device list once at startup; re-initializing
+        # it is the only way to see a device that was plugged back in.
+        # sounddevice has no public API for that, so this relies on its
+        # private _terminate()/_initialize()
+        speech = self.assistant.speech
+        if not speech.wait(timeout=5):
+            return False
+        # Holding the lock keeps a cached clip from starting to play meanwhile
+        if not speech.audio_lock.acquire(timeout=1):
+            return False
+        try:
+            import sounddevice as sd
+            sd._terminate()
+            sd._initialize()
+        except Exception as e:
+            print(f"Error re-initializing audio devices: {str(e)}")
+        finally:
+            speech.audio_lock.release()
+        return True
+
+    def report_error(self, error):
+        """Forward an error to the UI, rate limited, and restart on a burst."""
+        now = time.monotonic()
+        with self.error_lock:
+            self.recent_errors = [t for t in self.recent_errors if now - t < self.error_interval]
+            self.recent_errors.append(now)
+            if len(self.recent_errors) >= self.max_errors:
+                self.recent_errors = []
+                self.restart_requested.set()
+            if now - self.last_error_time < self.error_interval:
+                self.suppressed_errors += 1
+                return
+            suppressed, self.suppressed_errors = self.suppressed_errors, 0
+            self.last_error_time = now
+        message = f"Error: {str(error)}"
+        if suppressed:
+            message += f" ({suppressed} more suppressed)"
+        self.response_signal.emit(message)
+
+    def stop(self):
+        self.stop_requested.set()
+        if self.pipeline:
+            self.pipeline.stop()
+
+    def restart(self):
+        """Tear down the current pipeline and build a fresh one right away."""
+        self.manual_restart.set()
 
 def main():
     app = QApplication(sys.argv)
@@ -1,110 +1,109 @@
-import speech_recognition as sr
-import pyttsx3
 import random
-import sounddevice as sd
-import numpy as np
-import wave
-import io
 from assistant.task_manager import TaskManager
+from assistant.pipeline import VoicePipeline
+from assistant.speech_worker import SpeechWorker
+from assistant.speech_cache import SpeechCache
+from assistant.health_monitor import HealthMonitor
+from assistant.command_output import PREFIX, OutputStreamer, StreamedResponse, spoken_output
 
 class VoiceAssistant:
     def __init__(self):
-        self.engine = pyttsx3.init()
-        self.voices = self.engine.getProperty('voices')
+        # Speech runs on its own thread so speak() never blocks the caller
+        self.speech = SpeechWorker(rate=175, cache=SpeechCache())
+        self.speech.start()
         
-        # Set female voice by default
-        for voice in self.voices:
-            if "female" in voice.name.lower():
-                self.engine.setProperty('voice', voice.id)
-                break
-        
-        # Increase speech rate for faster response
-        self.engine.setProperty('rate', 175)
-        
-        self.recognizer = sr.Recognizer()
         self.task_manager = TaskManager()
+
+        # Fixed phrases, rendered once and then played from the speech cache
+        self.prompts = {
+            "welcome": "Welcome to Voice Assistant!",
+            "text_mode": "Text mode activated. Type your commands (type 'exit' to quit)",
+            "voice_mode": "Voice mode activated. Say your commands (say 'exit' or 'goodbye' to quit)",
+            "goodbye": "Goodbye!",
+            "error": "Sorry, I encountered an error. Please try again.",
+            "speech_service": "Sorry, I'm having trouble accessing the speech service."
+        }
+        self.speech.prewarm(self.canned_phrases())
         self.sample_rate = 16000
         self.channels = 1
-        
-        # Configure sounddevice
-        sd.default.samplerate = self.sample_rate
-        sd.default.channels = self.channels
+        self.listen_timeout = 5  # Seconds to wait for speech to start
+        # Talking over a reply to cut it short. Off by default: through
+        # laptop speakers the mic hears the reply and would cut it off
+        # itself, so only turn it on with headphones
+        self.barge_in_enabled = False
+
+        # Audio capture and speech recognition are only set up when voice
+        # mode first needs them, so text sessions never import them
+        self._capture = None
+        self._recognizer = None
 
         self.mode = None  # Will be set based on user choice
 
     def speak(self, text):
+        if isinstance(text, StreamedResponse):
+            # Some of the output was already shown and read out while the
+            # command ran; only finish what's left
+            if not text.printed:
+                print(f"Assistant: {text}")
+            rest = spoken_output(text, text.spoken_lines) if text.startswith(PREFIX) else str(text)
+            if rest:
+                self.speech.say(rest)
+            return
         # Split the text if it contains "Command output:"
         if "Command output:" in text:
             print(f"Assistant: {text}")  # Print full message with prefix
-            # Only speak the actual output part
-            output_text = text.split("Command output:")[1].strip()
-            self.engine.say(output_text)
+            # Only speak the actual output part, and only the start of a long one
+            output_text = spoken_output(text.split("Command output:")[1].strip())
+            self.speech.say(output_text)
         else:
             # For non-command outputs, both print and speak
             print(f"Assistant: {text}")
-            self.engine.say(text)
-    
-        self.engine.runAndWait()
+            self.speech.say(text)
+
+    @property
+    def capture(self):
+        if self._capture is None:
+            import sounddevice as sd
+            from assistant.audio_capture import AudioCapture
+
+            # Configure sounddevice
+            sd.default.samplerate = self.sample_rate
+            sd.default.channels = self.channels
+            self._capture = AudioCapture(self.sample_rate, self.channels)
+        return self._capture
+
+    @property
+    def recognizer(self):
+        if self._recognizer is None:
+            import speech_recognition as sr
+            self._recognizer = sr.Recognizer()
+        return self._recognizer
+
+    def canned_phrases(self):
+        """Replies that are spoken over and over and are worth caching."""
+        phrases = list(self.prompts.values())
+        for replies in self.task_manager.chat_responses.values():
+            phrases.extend(replies)
+        phrases.extend(HealthMonitor.tips)
+        return phrases
 
     def listen(self):
         try:
             print("\nListening...")
+            print("Go ahead, I'm listening...")
             
-            # Adjust audio settings
-            chunks = []
-            silence_count = 0
-            max_silence = 8  # Increased from 4 to 8 for better detection
-            min_volume = 0.01  # Reduced threshold for better sensitivity
-            
-            def callback(indata, frames, time, status):
-                if status:
-                    print(f"Debug - Audio status: {status}")
-                    return
-                
-                volume_norm = np.linalg.norm(indata) / frames
-                if volume_norm < min_volume:
-                    nonlocal silence_count
-                    silence_count += 1
-                else:
-                    silence_count = 0
-                chunks.append(indata.copy())
-
-            # Configure input stream with better settings
-            with sd.InputStream(
-                callback=callback,
-                channels=self.channels,
-                samplerate=self.sample_rate,
-                blocksize=int(self.sample_rate * 0.25),  # Reduced chunk size
-                device=None,  # Use default device
-                dtype=np.float32,
-                latency='high',  # More stable latency
-                extra_settings=None
-            ):
-                print("Go ahead, I'm listening...")
-                while silence_count < max_silence:
-                    sd.sleep(250)  # Reduced sleep time for better responsiveness
-            
-            if chunks and len(chunks) > 2:  # Ensure we have enough audio data
-                audio_data = np.concatenate(chunks, axis=0)
-                audio_data = (audio_data * np.iinfo(np.int16).max).astype(np.int16)
-                
-                wav_buffer = io.BytesIO()
-                with wave.open(wav_buffer, 'wb') as wav:
-                    wav.setnchannels(self.channels)
-                    wav.setsampwidth(2)
-                    wav.setframerate(self.sample_rate)
-                    wav.writeframes(audio_data.tobytes())
-                
-                return sr.AudioData(wav_buffer.getvalue(), self.sample_rate, 2)
-            
-            print("No speech detected")
-            return None
+            # Blocks until the voice activity detector closes the utterance
+            audio = self.capture.listen(timeout=self.listen_timeout)
+            if audio is None:
+                print("No speech detected")
+            return audio
             
         except Exception as e:
             print(f"Debug - Recording error: {str(e)}")
             return None
 
     def recognize_speech(self, audio):
+        import speech_recognition as sr
         try:
             text = self.recognizer.recognize_google(audio).lower()
             if text:
@@ -115,14 +114,19 @@ class VoiceAssistant:
             return None
         except sr.RequestError as e:
             print(f"Could not request results; {e}")
-            self.speak("Sorry, I'm having trouble accessing the speech service.")
+            self.speak(self.prompts["speech_service"])
             return None
 
-    def handle_command(self, command):
-        return self.task_manager.handle_command(command)
+    def handle_command(self, command, on_line=None):
+        return self.task_manager.handle_command(command, on_line)
+
+    def dispatch_streaming(self, command):
+        """Handle a command, printing and reading out shell output as it arrives."""
+        streamer = OutputStreamer(print_line=print, say=self.speech.say)
+        return streamer.finish(self.handle_command(command, on_line=streamer))
 
     def text_mode(self):
-        self.speak("Text mode activated. Type your commands (type 'exit' to quit)")
+        self.speak(self.prompts["text_mode"])
         
         while True:
             try:
@@ -130,44 +134,70 @@ class VoiceAssistant:
                 print("-" * 50)
                 
                 if command == "exit" or command == "goodbye":
-                    self.speak("Goodbye!")
+                    self.speak(self.prompts["goodbye"])
                     break
                     
-                response = self.handle_command(command)
+                response = self.dispatch_streaming(command)
                 if response:
                     self.speak(response)
                     
             except Exception as e:
                 print(f"Error: {str(e)}")
-                self.speak("Sorry, I encountered an error. Please try again.")
+                self.speak(self.prompts["error"])
+
+    def create_pipeline(self, verify=None, on_response=None, on_error=None, parallel_auth=True):
+        """Build the concurrent capture -> auth -> ASR -> dispatch -> TTS pipeline."""
+        return VoicePipeline(
+            listen=self.listen,
+            recognize=self.recognize_speech,
+            dispatch=self.dispatch_streaming,
+            cancel=self.cancel_running,
+            speak=self.speak,
+            verify=verify,
+            on_response=on_response,
+            on_error=on_error,
+            parallel_auth=parallel_auth,
+            # Without barge-in the mic hears our replies; only "cancel" gets through
+            ignore_during_playback=not self.barge_in_enabled
+        )
+
+    def cancel_running(self):
+        """Stop the running command and whatever is being read out of it."""
+        self.speech.interrupt()
+        return self.handle_command("cancel")
 
     def voice_mode(self):
-        self.speak("Voice mode activated. Say your commands (say 'exit' or 'goodbye' to quit)")
-        while True:
-            try:
-                audio = self.listen()
-                if audio is None:
-                    self.speak("Sorry, I didn't catch that. Please try again.")
-                    continue
-
-                command = self.recognize_speech(audio)
-                if not command:
-                    continue
-
-                if command in ["exit", "goodbye"]:
-                    self.speak("Goodbye!")
-                    break
-
-                response = self.handle_command(command)
-                if response:
-                    self.speak(response)
-
-            except Exception as e:
-                print(f"Error: {str(e)}")
-                self.speak("Sorry, I encountered an error. Please try again.")
+        self.speak(self.prompts["voice_mode"])
+        # Keep the microphone open so nothing is lost while we recognize or speak
+        self.configure_capture()
+        self.capture.open()
+        pipeline = self.create_pipeline(
+            on_error=lambda e: self.speak(self.prompts["error"])
+        )
+        pipeline.start()
+        try:
+            while not pipeline.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pipeline.stop()
+            self.capture.close()
+            self.capture.on_speech_start = None
+            pipeline.join()
+
+    def configure_capture(self):
+        """Tell the capture when we're speaking so it doesn't take our own voice as a command."""
+        self.capture.is_playing = self.speech.is_speaking
+        self.capture.on_speech_start = self.barge_in if self.barge_in_enabled else None
+
+    def barge_in(self):
+        # The user started talking, so stop reading out the previous reply
+        if self.speech.is_speaking():
+            self.speech.interrupt()
 
     def run(self):
-        self.speak("Welcome to Voice Assistant!")
+        self.speak(self.prompts["welcome"])
         self.mode = self.select_mode()
         
         if self.mode == "voice":
@@ -175,6 +205,10 @@ class VoiceAssistant:
         else:
             self.text_mode()
 
+        # Let the last reply finish before the process exits
+        self.speech.wait()
+        self.speech.shutdown()
+
     def select_mode(self):
         print("\n=== Voice Assistant Mode Selection ===")
         print("1. Voice Mode (Speech recognition)")
@@ -5,17 +5,21 @@ import os
 from scipy import signal
 import tempfile
 import time
+from assistant.voice_auth import features_path_for
+from assistant.speaker_store import SpeakerStore
+from assistant.voice_features import compute_embedding, normalize
 
 def record_sample(duration=5, sample_rate=16000):
     """Record an audio sample."""
     print(f"\nRecording for {duration} seconds...")
     print("Speak now!")
     
-    # Record audio
+    # Record as int16, like the live capture, so enrolled embeddings match
     recording = sd.rec(
         int(duration * sample_rate),
         samplerate=sample_rate,
-        channels=1
+        channels=1,
+        dtype='int16'
     )
     sd.wait()
     return recording.flatten()
@@ -30,13 +34,27 @@ def save_voice_signature(samples, output_path):
     
     # Save signature
     np.save(output_path, avg_sample)
+
+    # Drop cached features of the old signature so they get rebuilt
+    features_path = features_path_for(output_path)
+    if os.path.exists(features_path):
+        os.remove(features_path)
     return True
 
+def enroll_speaker(samples, speaker_id):
+    """Add the speaker's averaged embedding to the multi-speaker store."""
+    embedding = normalize(np.mean([compute_embedding(s) for s in samples], axis=0))
+    store = SpeakerStore()
+    store.enroll(speaker_id, embedding)
+    return store
+
 def main():
     print("Voice Registration Process")
     print("=========================")
     print("We'll record 3 samples of your voice.")
     print("Please speak the phrase: 'Voice authentication test'")
+
+    speaker_id = input("\nEnter your name: ").strip() or "default"
     
     samples = []
     
@@ -63,8 +81,10 @@ def main():
     )
     
     if save_voice_signature(samples, signature_path):
+        store = enroll_speaker(samples, speaker_id)
         print("\nVoice registration successful!")
         print(f"Signature saved to: {signature_path}")
+        print(f"Enrolled '{speaker_id}' ({len(store)} speaker(s) registered)")
         return True
     else:
         print("\nError saving voice signature.")
@@ -0,0 +1,148 @@
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class TranscriptModel(QAbstractListModel):
+    """Capped transcript for the GUI, shown through a QListView.
+
+    Only the newest `max_entries` lines are kept; older ones are dropped
+    from the front. Entries longer than `collapse_lines` lines or
+    `preview_chars` characters are shown collapsed to their start and
+    expand on request. Bodies over `max_chars` are cut to that length, so
+    a huge `systeminfo` dump doesn't sit in memory.
+
+    Saving the full transcript is opt-in: with `spill_dir` set, dropped
+    entries and long bodies are appended to a per-session file there and
+    long bodies are read back in full when expanded. Only the newest
+    `keep_spills` session files are kept.
+    """
+
+    def __init__(self, max_entries=2000, collapse_lines=6, preview_chars=1000, max_chars=8000,
+                 spill_dir=None, keep_spills=5, parent=None):
+        super().__init__(parent)
+        self.entries = deque()
+        self.max_entries = max_entries
+        self.collapse_lines = collapse_lines
+        self.preview_chars = preview_chars
+        self.max_chars = max_chars
+        self.spill = None
+        self.spill_lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.prune_spills(spill_dir, keep_spills - 1)
+            name = datetime.now().strftime("transcript-%Y%m%d-%H%M%S.log")
+            self.spill = open(os.path.join(spill_dir, name), 'a+b')
+
+    def prune_spills(self, spill_dir, keep):
+        """Delete all but the newest `keep` transcript files."""
+        # The timestamped names sort oldest first
+        names = sorted(name for name in os.listdir(spill_dir)
+                       if name.startswith("transcript-") and name.endswith(".log"))
+        for name in names[:max(0, len(names) - keep)]:
+            try:
+                os.remove(os.path.join(spill_dir, name))
+            except OSError as e:
+                print(f"Could not remove old transcript: {str(e)}")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.display_text(entry)
+        if role == Qt.ItemDataRole.ToolTipRole and entry['collapsed']:
+            return "Double-click to expand"
+        return None
+
+    def append(self, text):
+        lines = text.count("\n") + 1
+        entry = {
+            'time': datetime.now(),
+            'text': text,
+            'lines': lines,
+            'chars': len(text),
+            'offset': None,
+        }
+        entry['collapsed'] = self.collapsible(entry)
+        if len(text) > self.max_chars:
+            if self.spill:
+                entry['offset'], entry['length'] = self.write_spill(entry)
+                # Keep just enough to show the collapsed preview
+                entry['text'] = self.preview(text)
+            else:
+                entry['text'] = text[:self.max_chars]
+
+        if len(self.entries) >= self.max_entries:
+            self.beginRemoveRows(QModelIndex(), 0, 0)
+            evicted = self.entries.popleft()
+            self.endRemoveRows()
+            if self.spill and evicted['offset'] is None:
+                self.write_spill(evicted)
+
+        row = len(self.entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.entries.append(entry)
+        self.endInsertRows()
+
+    def toggle(self, index):
+        """Expand a collapsed entry, or collapse an expanded one."""
+        if not index.isValid():
+            return
+        entry = self.entries[index.row()]
+        if not self.collapsible(entry):
+            return
+        entry['collapsed'] = not entry['collapsed']
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
+
+    def display_text(self, entry):
+        stamp = entry['time'].strftime("%H:%M:%S")
+        if not entry['collapsed']:
+            if entry['offset'] is not None:
+                return f"[{stamp}] {self.read_spill(entry)}"
+            cut = entry['chars'] - len(entry['text'])
+            if cut > 0:
+                return f"[{stamp}] {entry['text']}\n… {cut} more characters not kept"
+            return f"[{stamp}] {entry['text']}"
+        preview = self.preview(entry['text'])
+        hidden = entry['lines'] - (preview.count("\n") + 1)
+        if hidden > 0:
+            more = f"{hidden} more lines"
+        else:
+            # One long line, or a few: count what's cut off instead
+            more = f"{max(0, entry['chars'] - len(preview))} more characters"
+        return f"[{stamp}] {preview}\n… {more} (double-click to expand)"
+
+    def collapsible(self, entry):
+        return entry['lines'] > self.collapse_lines or entry['chars'] > self.preview_chars
+
+    def preview(self, text):
+        """The first `collapse_lines` lines of `text`, cut to `preview_chars`."""
+        return "\n".join(text.split("\n", self.collapse_lines)[:self.collapse_lines])[:self.preview_chars]
+
+    def write_spill(self, entry):
+        data = f"[{entry['time'].isoformat(timespec='seconds')}] {entry['text']}\n".encode('utf-8')
+        with self.spill_lock:
+            self.spill.seek(0, os.SEEK_END)
+            offset = self.spill.tell()
+            self.spill.write(data)
+            self.spill.flush()
+        return offset, len(data)
+
+    def read_spill(self, entry):
+        with self.spill_lock:
+            self.spill.seek(entry['offset'])
+            data = self.spill.read(entry['length'])
+        # Drop the timestamp prefix and trailing newline added by write_spill
+        return data.decode('utf-8', errors='replace').split("] ", 1)[1].rstrip("\n")
+
+    def close(self):
+        if self.spill:
+            self.spill.close()
+            self.spill = None
@@ -1,22 +0,0 @@
-voice-assistant
-├── src
-│   ├── main.py
-│   ├── assistant
-│   │   ├── __init__.py
-│   │   ├── speech_recognition.py
-│   │   ├── voice_auth.py
-│   │   ├── task_manager.py
-│   │   └── system_control.py
-│   ├── commands
-│   │   ├── __init__.py
-│   │   └── command_handler.py
-│   └── utils
-│       ├── __init__.py
-│       └── audio_utils.py
-├── tests
-│   ├── __init__.py
-│   ├── test_speech_recognition.py
-│   └── test_voice_auth.py
-├── requirements.txt
-├── config.yaml
-└── README.md
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app runs as `python src/main.py`, so its modules import from src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,87 @@
+from assistant.chat_history import ChatHistory, estimate_tokens, CHARS_PER_TOKEN
+
+
+def turn(tokens):
+    return "x" * (tokens * CHARS_PER_TOKEN)
+
+
+def filled(count, tokens=100, **kwargs):
+    history = ChatHistory(**kwargs)
+    for i in range(count):
+        history.add('user' if i % 2 == 0 else 'model', turn(tokens))
+    return history
+
+
+def test_estimate_tokens_is_at_least_one():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens(turn(25)) == 25
+
+
+def test_within_budget():
+    history = filled(9, budget=1000)
+    assert not history.over_budget()
+    history.add('user', turn(100))
+    assert history.over_budget()
+
+
+def test_nothing_overflows_below_the_low_water_mark():
+    assert filled(5, budget=1000, keep_turns=2, low_water=0.6).overflow() == []
+
+
+def test_overflow_reaches_the_low_water_mark():
+    history = filled(20, budget=1000, keep_turns=4, low_water=0.6)
+    assert history.over_budget()
+    turns = history.overflow()
+    # Oldest first, and enough of them to get down to 600 tokens
+    assert turns == [(role, text) for role, text, _ in list(history.turns)[:len(turns)]]
+    assert history.tokens() - 100 * len(turns) <= 600
+    assert history.tokens() - 100 * (len(turns) - 1) > 600
+
+
+def test_overflow_keeps_the_newest_turns():
+    history = filled(6, tokens=1000, budget=1000, keep_turns=4)
+    assert len(history.overflow()) == 2
+
+
+def test_overflow_accounts_for_summary_and_pinned_facts():
+    plain = filled(20, budget=1000, keep_turns=2)
+    pinned = filled(20, budget=1000, keep_turns=2)
+    pinned.pin(turn(200))
+    assert len(pinned.overflow()) == len(plain.overflow()) + 2
+
+
+def test_compact_replaces_the_oldest_turns():
+    history = filled(20, budget=1000, keep_turns=4)
+    newest = list(history.turns)[-1]
+    turns = history.overflow()
+    history.compact(len(turns), "summary so far")
+    assert len(history.turns) == 20 - len(turns)
+    assert history.turns[-1] == newest
+    assert history.turn_tokens == sum(tokens for _, _, tokens in history.turns)
+    assert history.summary == "summary so far"
+    assert not history.over_budget()
+
+
+def test_compact_never_removes_more_than_it_has():
+    history = filled(3)
+    history.compact(10, "all gone")
+    assert len(history.turns) == 0
+    assert history.turn_tokens == 0
+
+
+def test_contents_puts_context_before_the_turns():
+    history = ChatHistory()
+    history.pin("my sister is called Anna")
+    history.add('user', "hi")
+    history.add('model', "hello")
+    contents = history.contents("how are you")
+    assert "Anna" in contents[0]['parts'][0]
+    assert contents[1] == {'role': 'model', 'parts': ["Understood."]}
+    assert [c['parts'][0] for c in contents[2:]] == ["hi", "hello", "how are you"]
+
+
+def test_fallback_summary_keeps_what_the_user_asked_within_limit():
+    history = ChatHistory(summary_tokens=10)
+    summary = history.fallback_summary([('user', "what is the weather"), ('model', "sunny")])
+    assert summary == "User asked: what is the weather"[-10 * CHARS_PER_TOKEN:]
+    assert "sunny" not in summary
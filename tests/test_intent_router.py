@@ -0,0 +1,67 @@
+import pytest
+
+from assistant.intent_router import IntentRouter, KEYWORD, FIRST, EXACT
+from commands.builtin import registry
+
+
+@pytest.mark.parametrize('command, intent', [
+    # Chat outranks date, so "today" doesn't turn small talk into a date query
+    ("how are you today", "chat"),
+    ("hello there", "chat"),
+    ("thank you", "chat"),
+    # ...but with no chat phrase, "day" still asks for the date
+    ("have a good day", "date"),
+    ("what day is it", "date"),
+    ("what is the date", "date"),
+    ("what time is it", "time"),
+    ("tell me the time", "time"),
+    # Shell commands only count as the first word, and then beat later keywords
+    ("ipconfig", "system"),
+    ("ping google.com today", "system"),
+    ("dir", "system"),
+    ("open youtube", "website"),
+    ("what is using my cpu", "processes"),
+    ("system info", "status"),
+    ("cancel", "cancel"),
+    ("help", "help"),
+    # Exact-match intents need the whole command
+    ("cancel the download", "default"),
+    ("help me", "default"),
+    # Whole words only: "info" doesn't match "information"
+    ("show system information", "default"),
+    ("xyz", "default"),
+])
+def test_builtin_rule_table(command, intent):
+    assert registry.resolve(command)[0] == intent
+
+
+def test_route_returns_the_matched_phrase():
+    assert registry.resolve("What is using my CPU?") == ("processes", "using my cpu")
+
+
+def test_whole_word_matching():
+    router = IntentRouter([("status", 50, KEYWORD, ["info"])], default="default")
+    assert router.route("system info") == ("status", "info")
+    assert router.route("information") == ("default", None)
+
+
+def test_first_and_exact_modes():
+    router = IntentRouter([
+        ("system", 90, FIRST, ["ping"]),
+        ("cancel", 100, EXACT, ["cancel"]),
+    ], default="default")
+    assert router.route("ping localhost")[0] == "system"
+    assert router.route("please ping localhost")[0] == "default"
+    assert router.route("cancel")[0] == "cancel"
+    assert router.route("cancel it")[0] == "default"
+
+
+def test_priority_then_earliest_then_longest():
+    router = IntentRouter([
+        ("low", 10, KEYWORD, ["alpha", "beta"]),
+        ("high", 20, KEYWORD, ["gamma"]),
+        ("long", 10, KEYWORD, ["alpha beta"]),
+    ])
+    assert router.route("alpha gamma")[0] == "high"
+    assert router.route("beta then alpha")[0] == "low"
+    assert router.route("alpha beta") == ("long", "alpha beta")
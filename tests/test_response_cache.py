@@ -0,0 +1,52 @@
+import pytest
+
+from assistant.response_cache import ResponseCache, normalize_prompt
+
+
+@pytest.mark.parametrize('prompt, normalized', [
+    ("What is the capital of France?", "what is the capital of france"),
+    ("  what is   the capital of france  ", "what is the capital of france"),
+    ("Hello, world!", "hello world"),
+    # Symbols inside words or between digits change the meaning
+    ("What is 2+2?", "what is 2+2"),
+    ("Explain C++.", "explain c++"),
+    ("node.js vs. python", "node.js vs python"),
+    ("3.14", "3.14"),
+    ("don't", "don't"),
+])
+def test_normalize_prompt(prompt, normalized):
+    assert normalize_prompt(prompt) == normalized
+
+
+@pytest.mark.parametrize('first, second', [
+    ("what is 2+2", "what is 2-2"),
+    ("what is 2+2", "what is 2*2"),
+    ("explain c++", "explain c"),
+    ("explain c#", "explain c"),
+])
+def test_different_prompts_stay_apart(first, second):
+    assert normalize_prompt(first) != normalize_prompt(second)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'responses.sqlite3'), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_cache_hits_rephrasings_only(cache):
+    cache.put('model', None, 'response', "What is 2+2?", "4")
+    assert cache.get('model', None, 'response', "what is 2+2") == "4"
+    assert cache.get('model', None, 'response', "what is 2-2") is None
+    assert cache.get('other-model', None, 'response', "what is 2+2") is None
+
+
+def test_cache_evicts_least_recently_used(cache):
+    cache.put('model', None, 'response', "a", "1")
+    cache.put('model', None, 'response', "b", "2")
+    cache.get('model', None, 'response', "a")
+    cache.put('model', None, 'response', "c", "3")
+    assert len(cache) == 2
+    assert cache.get('model', None, 'response', "b") is None
+    assert cache.get('model', None, 'response', "a") == "1"
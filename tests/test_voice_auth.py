@@ -1,22 +1,86 @@
-voice-assistant
-├── src
-│   ├── main.py
-│   ├── assistant
-│   │   ├── __init__.py
-│   │   ├── speech_recognition.py
-│   │   ├── voice_auth.py
-│   │   ├── task_manager.py
-│   │   └── system_control.py
-│   ├── commands
-│   │   ├── __init__.py
-│   │   └── command_handler.py
-│   └── utils
-│       ├── __init__.py
-│       └── audio_utils.py
-├── tests
-│   ├── __init__.py
-│   ├── test_speech_recognition.py
-│   └── test_voice_auth.py
-├── requirements.txt
-├── config.yaml
-└── README.md
\ No newline at end of file
+import os
+import types
+import wave
+
+import numpy as np
+import pytest
+from scipy import signal
+
+from assistant.speaker_store import SpeakerStore
+from assistant.voice_auth import VoiceAuthenticator
+from assistant.voice_features import StreamingSpectralStats, compute_embedding
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'assistant', 'voice_samples', 'voice_sample.wav')
+
+
+@pytest.fixture(scope='module')
+def sample():
+    """The bundled voice sample as 16 kHz int16, like the live capture."""
+    with wave.open(SAMPLE_PATH) as wav:
+        rate = wav.getframerate()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    return signal.resample_poly(samples.astype(np.float64), 16000, rate).astype(np.int16)
+
+
+def scaled(noise):
+    noise = noise - noise.mean()
+    return (noise / np.abs(noise).max() * 8000).astype(np.int16)
+
+
+def brown_noise(length, seed=0):
+    return scaled(np.cumsum(np.random.default_rng(seed).standard_normal(length)))
+
+
+def pink_noise(length, seed=0):
+    spectrum = np.fft.rfft(np.random.default_rng(seed).standard_normal(length))
+    frequencies = np.fft.rfftfreq(length)
+    frequencies[0] = frequencies[1]
+    return scaled(np.fft.irfft(spectrum / np.sqrt(frequencies), length))
+
+
+def captured(samples, streamed=False):
+    """Stand-in for AudioData; with `streamed`, carries features like AudioCapture's."""
+    audio = types.SimpleNamespace(frame_data=samples.tobytes())
+    if streamed:
+        audio.features = StreamingSpectralStats()
+        audio.features.update(samples)
+    return audio
+
+
+@pytest.fixture
+def legacy_auth(sample, tmp_path):
+    auth = VoiceAuthenticator(store=SpeakerStore(str(tmp_path / 'speakers')))
+    auth.voice_signature = sample.astype(np.float64)
+    auth.reference = auth.compute_reference_features()
+    return auth
+
+
+@pytest.mark.parametrize('streamed', [False, True])
+def test_legacy_signature_accepts_the_recording_it_was_made_from(legacy_auth, sample, streamed):
+    assert legacy_auth.verify_voice(captured(sample, streamed))
+
+
+@pytest.mark.parametrize('streamed', [False, True])
+def test_legacy_signature_rejects_noise(legacy_auth, sample, streamed):
+    assert not legacy_auth.verify_voice(captured(brown_noise(len(sample)), streamed))
+
+
+@pytest.fixture
+def enrolled_auth(sample, tmp_path):
+    # Enrolled on the first 3 s, silence before speaking included, like register_voice
+    store = SpeakerStore(str(tmp_path / 'speakers'))
+    store.enroll('alice', compute_embedding(sample[:3 * 16000]))
+    return VoiceAuthenticator(store=store)
+
+
+@pytest.mark.parametrize('streamed', [False, True])
+def test_enrolled_speaker_is_identified_from_other_speech(enrolled_auth, sample, streamed):
+    assert enrolled_auth.verify_voice(captured(sample[3 * 16000:], streamed))
+    assert enrolled_auth.last_speaker == 'alice'
+
+
+@pytest.mark.parametrize('noise', [brown_noise, pink_noise])
+@pytest.mark.parametrize('seconds', [1, 2, 3])
+def test_enrolled_speaker_rejects_noise(enrolled_auth, noise, seconds):
+    for seed in range(3):
+        assert not enrolled_auth.verify_voice(captured(noise(seconds * 16000, seed), streamed=True))